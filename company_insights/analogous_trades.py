@@ -1,87 +1,241 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-import re
-import pandas as pd
-from collections import defaultdict
 
-# For the LLM
-from langchain_ollama import ChatOllama
+from utils.clients import get_llm
+from utils.concurrency import call_provider
+from utils.date_extraction import DATE_RULES_MIN_CONFIDENCE, date_candidates
+from utils.llm_cache import cached_completion
+from utils.prompt_context import SYNTHESIS_CONTEXT_TOKENS, build_competitor_context
+from utils.ticker_resolver import normalize_name, resolve_ticker
+from utils.tokens import estimate_tokens
+from utils.tracing import DEBUG, ERROR, log, span
 
-# For Tavily Search
-from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
-from langchain_community.tools.tavily_search.tool import TavilySearchResults
-
-import yahooquery as yq
+# pandas, yahooquery and langchain are imported on first use so that importing
+# this module stays fast for entry points that only need part of it.
 
 load_dotenv()
-os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
 
-llm = ChatOllama(model="llama3.2")
+# Number of competitor date prompts sent to Ollama at once
+DATE_INFERENCE_CONCURRENCY = int(os.getenv("DATE_INFERENCE_CONCURRENCY", "4"))
+
+# How many past events to retrieve from the local event index, and how similar
+# (cosine) they must be to be offered to the LLM as analog candidates
+ANALOG_CANDIDATES = int(os.getenv("ANALOG_CANDIDATES", "8"))
+ANALOG_MIN_SCORE = float(os.getenv("ANALOG_MIN_SCORE", "0.5"))
+
+# Number of competitor price windows fetched at once
+PRICE_FETCH_CONCURRENCY = int(os.getenv("PRICE_FETCH_CONCURRENCY", "4"))
+
 
-# 3) Initialize Tavily Search
-search_api = TavilySearchAPIWrapper()
-tavily_tool = TavilySearchResults(api_wrapper=search_api)
+def invoke_llm(prompt):
+    """Runs a prompt through the shared LLM, reusing cached responses for repeat prompts."""
+    llm = get_llm()
+    with span("llm.invoke", prompt_tokens=estimate_tokens(prompt)) as current:
+        response = cached_completion(
+            llm.model,
+            prompt,
+            lambda: call_provider("ollama", lambda: llm.invoke(prompt)).content,
+            params={"temperature": llm.temperature},
+        )
+        current.set(response_tokens=estimate_tokens(response))
+    return response
+
+
+def invoke_structured(prompt, schema):
+    """
+    Asks the LLM for JSON matching the pydantic model `schema` (see
+    utils/structured_output.py). Returns the validated instance, or None if the
+    model produced no valid output within the repair attempts.
+    """
+    from utils.structured_output import StructuredOutputError, structured_completion
+
+    try:
+        result = structured_completion(prompt, schema)
+    except StructuredOutputError as e:
+        log(f"Error getting structured LLM output: {e}", ERROR)
+        return None
+    log(result, DEBUG)
+    return result
+
+
+def invoke_structured_batch(
+    prompts, schema, max_concurrency=DATE_INFERENCE_CONCURRENCY
+):
+    """
+    Runs several independent structured prompts concurrently. Ollama only
+    serves them in parallel when OLLAMA_NUM_PARALLEL allows it.
+    """
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return list(executor.map(lambda p: invoke_structured(p, schema), prompts))
 
 
 # ---------------------------------------------------------------------------- #
 #                        Identify Similar Companies/Events                     #
 # ---------------------------------------------------------------------------- #
-def search_similar_companies_and_events(company_event_description, max_competitors=3):
+def _is_subject_event(item, event_description, company, event_date):
+    """Whether an index item is the analyzed event itself or from the same company."""
+    metadata = item["metadata"]
+    if " ".join(item["text"].split()).lower() == (
+        " ".join(event_description.split()).lower()
+    ):
+        return True
+    if company and normalize_name(metadata.get("company") or "") == normalize_name(
+        company
+    ):
+        return True
+    # Events from the day of the analyzed event onwards are not precedents
+    return bool(event_date and metadata.get("date") and metadata["date"] >= event_date)
+
+
+def find_analog_candidates(
+    event_description, company=None, event_date=None, k=ANALOG_CANDIDATES
+):
     """
-    1) Ask the LLM to propose competitor companies that experienced a similar event.
-    2) For each proposed competitor event, call Tavily to gather historical context.
+    Looks up past events similar to the description in the local event index
+    (see utils/vector_index.py), leaving out the event itself, events of the
+    analyzed company and events on or after its YYYY-MM-DD event_date.
+    Returns a list of index items, most similar first.
+    """
+    from utils.vector_index import get_event_index
+
+    with span("event_index.search") as current:
+        try:
+            # Fetch extra matches since the event's own entries rank first
+            matches = get_event_index().search(
+                event_description, k=k * 2, min_score=ANALOG_MIN_SCORE
+            )
+        except Exception as e:
+            log(f"Error searching the event index: {e}", ERROR)
+            return []
+        candidates = [
+            item
+            for _, item in matches
+            if not _is_subject_event(item, event_description, company, event_date)
+        ][:k]
+        current.set(items=len(candidates))
+    return candidates
+
+
+def _format_analog_candidates(candidates):
+    lines = []
+    for item in candidates:
+        metadata = item["metadata"]
+        date = metadata.get("date") or "unknown date"
+        # Competitor events recorded from earlier analyses are LLM output, not
+        # reported news
+        note = ""
+        if metadata.get("source") == "analysis":
+            note = " (unverified, from an earlier analysis)"
+        lines.append(
+            f"    - [{date}] {metadata.get('company', '')}{note}: {item['text']}"
+        )
+    return "\n".join(lines)
 
-    Returns a list of dicts, each containing:
-      {
-        'competitor': <company name>,
-        'reasoning': <short reason from LLM>,
-        'event_date': <parsed event date from llm reasoning>
-      }
+
+def find_competitors(
+    company_event_description, max_competitors=3, company=None, event_date=None
+):
     """
-    # ---------------------- Step 1: LLM to find competitor companies  ---------------------- #
+    Asks the LLM to propose competitor companies that experienced a similar event,
+    ranking candidates retrieved from the local event index when there are any.
+    `company` and `event_date` keep the analyzed event itself out of the candidates.
+
+    Returns a list of (competitor, reasoning) tuples.
+    """
+    candidates = find_analog_candidates(company_event_description, company, event_date)
+    candidate_section = ""
+    if candidates:
+        candidate_section = f"""
+    These past events from our records may be analogous, most similar first.
+    Entries marked unverified were suggested by an earlier analysis, so check them:
+{_format_analog_candidates(candidates)}
+
+    Prefer competitors from this list when they fit, and explain why they are analogous.
+    Only suggest other companies if fewer than {max_competitors} of these are good matches.
+"""
+
     prompt_competitors = f"""
     You are a market analyst. The company event is:
     "{company_event_description}"
 
     Identify up to {max_competitors} competitor companies in the same industry that had a similar event.
     Provide reasoning for each competitor.
-
-    STRICT RULES:
-    - **RETURN ONLY VALID JSON** (No extra text).
-    - **NO INTRODUCTION OR EXPLANATION**.
-    - Use this exact JSON structure:
-    [{{"competitor": "<company name>", "reasoning": "<detailed reason of the similar event and what happened to the company's stock as a resultt of it, provide a very specific date Year Month Day of when the event happened>"}}]
+    {candidate_section}
+    Answer in JSON with a "competitors" list. For each competitor give its company
+    name as "competitor" and as "reasoning" a detailed description of the similar
+    event, the very specific date (year, month, day) it happened, and what happened
+    to the company's stock as a result of it.
     """
 
-    llm_response = llm.invoke(prompt_competitors)
+    from utils.structured_output import CompetitorEvents
 
-    # Parse the response (assume well-formed JSON, but be prepared for fallback)
+    result = invoke_structured(prompt_competitors, CompetitorEvents)
+    if result is None:
+        return []
+
+    return [
+        (item.competitor.strip(), item.reasoning.strip())
+        for item in result.competitors[:max_competitors]
+        if item.competitor.strip()
+    ]
 
-    competitor_info = extract_competitor_info(llm_response.content)
-    print(competitor_info)
 
-    if not isinstance(competitor_info, list):
-        competitor_info = []
+def competitor_date_query(competitor, reasoning):
+    return f"Historical details about {competitor} having a similar event to: {reasoning}. Focus on date and financial impact."
 
-    # ---------------------- Step 2: For each competitor, identify the date of what happened ---------------------- #
-    results = []
-    for item in competitor_info:
-        competitor = item.get("competitor", "")
-        reasoning = item.get("reasoning", "")
-        if not competitor:
-            continue
 
-        query = f"Historical details about {competitor} having a similar event to: {reasoning}. Focus on date and financial impact."
+def remember_competitor_events(competitor_events):
+    """Adds competitor events to the event index so later analyses can retrieve them."""
+    try:
+        from utils.vector_index import record_competitor_events
 
-        event_date = infer_event_date_with_llm(query)
+        record_competitor_events(competitor_events)
+    except Exception as e:
+        log(f"Error updating the event index: {e}", ERROR)
 
-        results.append(
-            {"competitor": competitor, "reasoning": reasoning, "event_date": event_date}
-        )
 
-        print(results)
+def search_similar_companies_and_events(
+    company_event_description,
+    max_competitors=3,
+    date_inference="batch",
+    company=None,
+    event_date=None,
+):
+    """
+    1) Ask the LLM to propose competitor companies that experienced a similar event,
+       ranking candidates retrieved from the local event index when there are any.
+    2) Infer the date of every competitor event in one step. With
+       date_inference="batch" the date prompts are sent concurrently; with
+       date_inference="single" they are folded into one structured request.
+
+    Returns a list of dicts, each containing:
+      {
+        'competitor': <company name>,
+        'reasoning': <short reason from LLM>,
+        'event_date': <parsed event date from llm reasoning>
+      }
+    """
+    # ---------------------- Step 1: LLM to find competitor companies  ---------------------- #
+    competitors = find_competitors(
+        company_event_description, max_competitors, company, event_date
+    )
 
+    # ---------------------- Step 2: Identify the date of what happened for all competitors ---------------------- #
+    queries = [
+        competitor_date_query(competitor, reasoning)
+        for competitor, reasoning in competitors
+    ]
+    event_dates = infer_event_dates(queries, mode=date_inference)
+
+    results = [
+        {"competitor": competitor, "reasoning": reasoning, "event_date": event_date}
+        for (competitor, reasoning), event_date in zip(competitors, event_dates)
+    ]
+    log(results, DEBUG)
+
+    remember_competitor_events(results)
     return results
 
 
@@ -92,8 +246,10 @@ def get_stock_data_for_event(ticker, event_date_str, days_before=30, days_after=
     """
     Given a ticker and an event_date_str (YYYY-MM-DD), retrieve stock data from
     (event_date - days_before) to (event_date + days_after) via yahooquery.
+    Bars already stored in the local price cache are read from disk, and only
+    the missing date ranges are downloaded.
 
-    Returns a list of dicts with price data. If event_date is None/invalid,
+    Returns a DataFrame with price data. If event_date is None/invalid,
     returns an error dict.
     """
     if not event_date_str:
@@ -107,28 +263,79 @@ def get_stock_data_for_event(ticker, event_date_str, days_before=30, days_after=
     start_date = (event_date - timedelta(days=days_before)).strftime("%Y-%m-%d")
     end_date = (event_date + timedelta(days=days_after)).strftime("%Y-%m-%d")
 
-    stock = yq.Ticker(ticker)
-    # yahooquery's 'history' can accept start and end date
-    history = stock.history(start=start_date, end=end_date)
+    from utils.price_cache import get_history
+
+    with span("price.history", symbol=ticker) as current:
+        history = get_history(ticker, start_date, end_date)
+        current.set(rows=len(history))
 
     if history.empty:
         return {
             "error": f"No stock data found for {ticker} between {start_date} and {end_date}."
         }
 
-    history.reset_index(inplace=True)
-    print(history.to_dict(orient="records"))
-    return history.to_dict(orient="records")
+    return history
+
+
+def fetch_competitor_stock_data(competitor_event, days_before=30, days_after=30):
+    """
+    Resolves the competitor's own ticker, stores it on the event as 'ticker',
+    and returns the parsed price insights around the event date (or an error dict).
+    """
+    competitor = competitor_event["competitor"]
+    competitor_ticker = resolve_ticker(competitor)
+    competitor_event["ticker"] = competitor_ticker
+    if not competitor_ticker:
+        return {"error": f"Could not resolve a ticker for {competitor}."}
+
+    return get_stock_insights(
+        competitor_ticker,
+        competitor_event["event_date"],
+        days_before=days_before,
+        days_after=days_after,
+    )
+
+
+def get_stock_insights(ticker, event_date_str, days_before=30, days_after=30):
+    """Returns parse_stock_data insights for the window around an event, or an error dict."""
+    stock_data = get_stock_data_for_event(
+        ticker, event_date_str, days_before=days_before, days_after=days_after
+    )
+    if isinstance(stock_data, dict):
+        # Keep the error message so the final prompt explains the gap
+        return stock_data
+    with span("parse_stock_data", rows=len(stock_data)):
+        return parse_stock_data(stock_data)
+
+
+def score_competitor_events(competitor_events):
+    """
+    Attaches market-model abnormal returns against the benchmark index to each
+    competitor event as 'abnormal_returns', scoring all events in one pass.
+    """
+    from utils.event_study import event_study
+
+    try:
+        with span("event_study", items=len(competitor_events)):
+            studies = event_study(
+                [(ce.get("ticker"), ce.get("event_date")) for ce in competitor_events]
+            )
+    except Exception as e:
+        log(f"Error computing abnormal returns: {e}", ERROR)
+        return
+    for ce, study in zip(competitor_events, studies):
+        ce["abnormal_returns"] = study
 
 
 # ---------------------------------------------------------------------------- #
 #                    C) Main Analysis Orchestration Function                   #
 # ---------------------------------------------------------------------------- #
-def analyze_company_highlight(company, event_description, ticker):
+def analyze_company_highlight(company, event_description, ticker, event_date=None):
     """
     1. Use an LLM to find competitor companies that had a similar event.
-    3. Fetch stock price data around that date ideentified.
-    4. Finally, use the LLM once more to synthesize all of this information into a
+    2. Resolve each competitor's ticker, fetch its stock price data around the
+       date identified and compute its abnormal returns against the market.
+    3. Finally, use the LLM once more to synthesize all of this information into a
        coherent financial analysis.
 
     Returns:
@@ -136,7 +343,7 @@ def analyze_company_highlight(company, event_description, ticker):
         competitor_info (list): Detailed info about competitor events & stock data.
     """
 
-    print(
+    log(
         f"\n=== Analyzing Event for {company} ===\nEvent Description: {event_description}\n"
     )
 
@@ -144,52 +351,56 @@ def analyze_company_highlight(company, event_description, ticker):
     #  Step 1: Identify Similar Companies and Events   #
     # ------------------------------------------------ #
     competitor_events = search_similar_companies_and_events(
-        event_description, max_competitors=3
+        event_description, max_competitors=3, company=company, event_date=event_date
     )
-    print("\n--- Similar Company Events (from LLM + Tavily) ---")
+    log("\n--- Similar Company Events (from LLM + Tavily) ---")
     for ce in competitor_events:
-        print(
+        log(
             f"* Competitor: {ce['competitor']}\n  Reason: {ce['reasoning']}\n  Event Date: {ce['event_date']}"
         )
 
     # ------------------------------------------------ #
     #  Step 2: Fetch Stock Data for the Discovered Date
     # ------------------------------------------------ #
-    # Store extended info in a new field
-    for ce in competitor_events:
-        event_date = ce["event_date"]
-        # Example: if we found a date, fetch stock data ~1mo before, 1mo after
-        stock_data = get_stock_data_for_event(
-            ticker, event_date, days_before=30, days_after=30
+    # Each competitor's window (~1mo before, 1mo after) is fetched under its own
+    # ticker, in parallel, and stored in a new field
+    with ThreadPoolExecutor(max_workers=PRICE_FETCH_CONCURRENCY) as executor:
+        parsed_insights = list(
+            executor.map(fetch_competitor_stock_data, competitor_events)
         )
-        parsed_insights = parse_stock_data(
-            stock_data
-        )  # Assuming stock_data is provided
-        print(parsed_insights)
-        ce["stock_data"] = parsed_insights
+    for ce, insights in zip(competitor_events, parsed_insights):
+        log(insights, DEBUG)
+        ce["stock_data"] = insights
+    score_competitor_events(competitor_events)
 
     # ------------------------------------------------ #
     #  Step 3: Synthesize Everything via LLM
     # ------------------------------------------------ #
-    # Format a prompt that references the competitor info, event date, and stock data
-    competitor_summaries = []
-    for ce in competitor_events:
-        competitor_summaries.append(
-            f"""
-                Competitor: {ce["competitor"]}
-                Event Date: {ce["event_date"]}
-                Reasoning: {ce["reasoning"]}
-                Stock Data: {ce["stock_data"]}
-            """
-        )
+    final_analysis = synthesize_analysis(
+        company, event_description, ticker, competitor_events
+    )
+
+    return final_analysis, competitor_events
+
+
+def synthesize_analysis(company, event_description, ticker, competitor_events):
+    """
+    Asks the LLM for the final financial analysis of an event, given competitor
+    events that already carry their 'ticker' and 'stock_data', and optionally
+    'abnormal_returns'.
+    """
+    # Render the competitor data compactly within the context token budget
+    competitor_context, context_tokens = build_competitor_context(competitor_events)
 
     final_prompt = f"""
-        You are a financial analyst. A major event has occurred for {company}: 
+        You are a financial analyst. A major event has occurred for {company} ({ticker}): 
         "{event_description}"
 
-        We identified some competitor events and historical data:
+        We identified some competitor events and historical data (price moves over
+        the window around each event; CAR = cumulative abnormal return vs the market
+        over the trading-day window, with its t-stat):
 
-        {"".join(competitor_summaries)}
+{competitor_context}
 
         Please provide a structured financial analysis:
         1. Analyze the financial data above and outline your summary of the stock progress for each company. 
@@ -200,141 +411,227 @@ def analyze_company_highlight(company, event_description, ticker):
         Provide your answer in a concise, professional tone.
     """
 
-    print("\n--- Final LLM Prompt ---")
-    print(final_prompt)
-    print("\n--- Generating Final Analysis ---")
+    log(
+        f"Synthesis prompt: ~{estimate_tokens(final_prompt)} tokens "
+        f"(competitor context {context_tokens}/{SYNTHESIS_CONTEXT_TOKENS})"
+    )
+    log("\n--- Final LLM Prompt ---", DEBUG)
+    log(final_prompt, DEBUG)
+    log("\n--- Generating Final Analysis ---")
 
-    final_analysis = llm.invoke(final_prompt)
-    print(f"\n=== Final Analysis ===\n{final_analysis}")
+    with span("synthesis", company=company, context_tokens=context_tokens):
+        final_analysis = invoke_llm(final_prompt)
+    log(f"\n=== Final Analysis ===\n{final_analysis}")
 
-    return final_analysis, competitor_events
+    return final_analysis
+
+
+def _date_prompt(query):
+    return f"""
+    Here is a query of an event for a company:
+    {query}
+
+    Infer the most likely date this event happened. Answer in JSON with a "date"
+    field in YYYY-MM-DD format, or null if the date cannot be inferred.
+    """
 
 
-def extract_competitor_info(llm_response_text):
+def infer_event_date(query):
     """
-    Extracts competitor names and reasoning from an LLM response string
-    that is JSON-like but may not be perfectly formatted.
+    Infers the date of an event, reading it from the query text when it is
+    stated clearly and asking the LLM otherwise.
+    Returns a YYYY-MM-DD string, or None.
     """
+    return infer_event_dates([query])[0]
 
-    # Define a regex pattern to capture competitors and their reasoning
-    pattern = r'\{\s*"competitor":\s*"([^"]+)",\s*"reasoning":\s*"([^"]+)"\s*\}'
 
-    matches = re.findall(pattern, llm_response_text)
+def infer_event_dates(queries, mode="batch"):
+    """
+    Infers the dates of several events. Dates found in a query with enough
+    confidence by rule-based extraction are used directly, and only the other
+    queries go to infer_event_dates_with_llm. If the LLM has no answer either,
+    the best vaguer date in the text (a month, quarter or year) is used.
 
-    # Convert matches into a structured list
-    competitors = [
-        {"competitor": comp, "reasoning": reason} for comp, reason in matches
+    Returns a list of YYYY-MM-DD strings (or None) in the order of `queries`.
+    """
+    candidates = [date_candidates(query) for query in queries]
+    event_dates = [
+        found[0]["date"]
+        if found and found[0]["confidence"] >= DATE_RULES_MIN_CONFIDENCE
+        else None
+        for found in candidates
     ]
+    missing = [i for i, event_date in enumerate(event_dates) if event_date is None]
+    log(
+        f"Extracted {len(queries) - len(missing)}/{len(queries)} event dates without the LLM",
+        DEBUG,
+    )
 
-    return competitors
+    if missing:
+        llm_dates = infer_event_dates_with_llm([queries[i] for i in missing], mode=mode)
+        for i, llm_date in zip(missing, llm_dates):
+            # Relative phrases are not a fallback: they may not refer to today
+            absolute = [
+                c
+                for c in candidates[i]
+                if c["confidence"] > 0 and not c["precision"].startswith("relative")
+            ]
+            if llm_date is None and absolute:
+                llm_date = absolute[0]["date"]
+            event_dates[i] = llm_date
+    return event_dates
 
 
-def normalize_date(date_str):
+def _date_string(result):
+    return result.date.isoformat() if result is not None and result.date else None
+
+
+def infer_event_dates_with_llm(queries, mode="batch"):
     """
-    Converts extracted dates into standardized YYYY-MM-DD format.
+    Infers the most probable date for several event queries at once.
+
+    mode="batch" sends one date prompt per query concurrently, while
+    mode="single" asks for all dates in one structured request and falls back
+    to batched prompts for any query it returned no date for.
+
+    Returns a list of YYYY-MM-DD strings (or None) in the order of `queries`.
     """
-    try:
-        # If already in YYYY-MM-DD
-        if re.match(r"\d{4}-\d{2}-\d{2}", date_str):
-            return date_str
-        # Convert MM/DD/YYYY
-        elif re.match(r"\d{2}/\d{2}/\d{4}", date_str):
-            return datetime.strptime(date_str, "%m/%d/%Y").strftime("%Y-%m-%d")
-        # Convert "Month Day, Year" (e.g., "March 15, 2021")
-        elif re.match(r"[A-Za-z]+ \d{1,2}, \d{4}", date_str):
-            return datetime.strptime(date_str, "%B %d, %Y").strftime("%Y-%m-%d")
-        # If only the year is found, default to January 1st
-        elif re.match(r"\d{4}", date_str):
-            return f"{date_str}-01-01"
-    except ValueError:
-        return None  # If parsing fails
+    if not queries:
+        return []
 
-    return None  # Default case
+    if mode == "single":
+        event_dates = _infer_event_dates_single_request(queries)
+    else:
+        event_dates = [None] * len(queries)
 
+    missing = [i for i, event_date in enumerate(event_dates) if event_date is None]
+    if missing:
+        from utils.structured_output import EventDate
 
-def infer_event_date_with_llm(query):
-    """
-    This function uses an LLM to infer the most probable date.
-    """
-    prompt = f"""
-    Here is a query of an event for a company:
-    {query}
+        results = invoke_structured_batch(
+            [_date_prompt(queries[i]) for i in missing], EventDate
+        )
+        for i, result in zip(missing, results):
+            event_dates[i] = _date_string(result)
+
+    return event_dates
 
-    Please infer the most likely date this event happened. Return your response in strictly YYYY-MM-DD format.
-    STILL PROVIDE THE DATE ONLY!!!
 
-    DO NOT BE CONVERSATIONAL!!!! OUTPUT ONLY THE DATE!!!!!
+def _infer_event_dates_single_request(queries):
+    numbered_queries = "\n".join(
+        f"{idx}. {query}" for idx, query in enumerate(queries, start=1)
+    )
+    prompt = f"""
+    Here are {len(queries)} numbered queries about events for companies:
+    {numbered_queries}
 
-    The output should be nothing but the format below:
-    YYYY-MM-DD
+    Infer the most likely date each event happened. Answer in JSON with a "dates"
+    list of exactly {len(queries)} entries in the same order as the queries, each
+    in YYYY-MM-DD format or null if that date cannot be inferred.
     """
 
-    llm_response = llm.invoke(prompt)
-    print(llm_response)
-    return normalize_date(llm_response.content.strip())
+    from utils.structured_output import event_dates_model
+
+    result = invoke_structured(prompt, event_dates_model(len(queries)))
+    if result is None:
+        return [None] * len(queries)
+    return [date.isoformat() if date else None for date in result.dates]
+
+
+def _group_lists(series):
+    """Collects a symbol-indexed Series into {symbol: [values...]}."""
+    return {symbol: values.tolist() for symbol, values in series.groupby(level=0)}
+
+
+def _extreme_day(extremes, symbol):
+    if symbol not in extremes.index:
+        return {"date": None, "percentage": None}
+    row = extremes.loc[symbol]
+    return {
+        "date": row["date_str"],
+        "percentage": round(float(row["daily_return"]), 2),
+    }
 
 
 def parse_stock_data(stock_data):
     """
     Parses stock data to extract insights for each company.
 
+    All metrics are computed for every symbol in one grouped pass over the
+    history DataFrame, so many events can be summarized without per-row
+    Python loops.
+
     Args:
-        stock_data (list): A list of dictionaries containing stock data for multiple companies.
+        stock_data (pd.DataFrame | list): Price history for one or more companies,
+            either the DataFrame returned by get_stock_data_for_event or a list
+            of dictionaries with the same columns.
 
     Returns:
         dict: A dictionary mapping company symbols to their summarized insights.
     """
-    # Group data by company symbol
-    company_data = defaultdict(list)
-    for entry in stock_data:
-        company_data[entry["symbol"]].append(entry)
-
-    insights = {}
-
-    for symbol, data in company_data.items():
-        df = pd.DataFrame(data)
-
-        # Ensure date is sorted in ascending order
-        df.sort_values(by="date", inplace=True)
+    import pandas as pd
 
-        # Calculate percentage change
-        df["daily_return"] = df["close"].pct_change() * 100  # Percentage change
-        df["volatility"] = df["high"] - df["low"]  # Intraday volatility
-        df["moving_avg_7d"] = (
-            df["close"].rolling(window=7).mean()
-        )  # 7-day moving average
-
-        # Identify largest single-day change
-        max_drop = df.loc[df["daily_return"].idxmin()]
-        max_gain = df.loc[df["daily_return"].idxmax()]
-
-        # Identify trends
-        start_price = df.iloc[0]["close"]
-        end_price = df.iloc[-1]["close"]
-        overall_change = ((end_price - start_price) / start_price) * 100
-
-        # Volume trend (average and any major spikes)
-        avg_volume = df["volume"].mean()
-        high_volume_days = df[df["volume"] > (1.5 * avg_volume)]
+    df = (
+        stock_data if isinstance(stock_data, pd.DataFrame) else pd.DataFrame(stock_data)
+    )
+    if df.empty:
+        return {}
+    if "symbol" not in df.columns:
+        # Raw yahooquery history is indexed by (symbol, date)
+        df = df.reset_index()
+
+    # Ensure dates are sorted in ascending order within each symbol
+    df = df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+    by_symbol = df.groupby("symbol", sort=False)
+
+    # Percentage change and 7-day moving average per symbol
+    df["daily_return"] = by_symbol["close"].pct_change() * 100
+    df["moving_avg_7d"] = (
+        by_symbol["close"].rolling(window=7).mean().reset_index(level=0, drop=True)
+    )
+    df["date_str"] = df["date"].astype(str)
+
+    # Identify trends
+    closes = by_symbol["close"].agg(["first", "last"])
+    overall_change = ((closes["last"] - closes["first"]) / closes["first"]) * 100
+
+    # Identify largest single-day change
+    returns = df.dropna(subset=["daily_return"]).groupby("symbol")["daily_return"]
+    max_gain = df.loc[returns.idxmax(), ["symbol", "date_str", "daily_return"]]
+    max_drop = df.loc[returns.idxmin(), ["symbol", "date_str", "daily_return"]]
+    max_gain = max_gain.set_index("symbol")
+    max_drop = max_drop.set_index("symbol")
+
+    # Volume trend (average and any major spikes)
+    avg_volume = by_symbol["volume"].transform("mean")
+    high_volume = df.loc[df["volume"] > (1.5 * avg_volume)].set_index("symbol")
+    high_volume_dates = _group_lists(high_volume["date_str"])
+    high_volume_volumes = _group_lists(high_volume["volume"])
+
+    # Last 5 moving average entries for trend
+    moving_avg = (
+        df.dropna(subset=["moving_avg_7d"])
+        .groupby("symbol")
+        .tail(5)
+        .set_index("symbol")["moving_avg_7d"]
+    )
+    moving_avgs = _group_lists(moving_avg)
 
-        # Summary insights
+    # Summary insights
+    insights = {}
+    for symbol in closes.index:
         insights[symbol] = {
-            "overall_price_change": round(overall_change, 2),
-            "max_single_day_gain": {
-                "date": str(max_gain["date"]),
-                "percentage": round(max_gain["daily_return"], 2),
-            },
-            "max_single_day_drop": {
-                "date": str(max_drop["date"]),
-                "percentage": round(max_drop["daily_return"], 2),
-            },
+            "overall_price_change": round(float(overall_change[symbol]), 2),
+            "max_single_day_gain": _extreme_day(max_gain, symbol),
+            "max_single_day_drop": _extreme_day(max_drop, symbol),
             "high_volume_days": [
-                {"date": str(row["date"]), "volume": row["volume"]}
-                for _, row in high_volume_days.iterrows()
+                {"date": day, "volume": volume}
+                for day, volume in zip(
+                    high_volume_dates.get(symbol, []),
+                    high_volume_volumes.get(symbol, []),
+                )
             ],
-            "7_day_moving_avg": df["moving_avg_7d"]
-            .dropna()
-            .tolist()[-5:],  # Last 5 entries for trend
+            "7_day_moving_avg": moving_avgs.get(symbol, []),
         }
 
     return insights
@@ -0,0 +1,220 @@
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import Future
+from datetime import datetime
+
+from analogous_trades import (
+    competitor_date_query,
+    find_competitors,
+    get_stock_insights,
+    infer_event_date,
+    remember_competitor_events,
+    score_competitor_events,
+    synthesize_analysis,
+)
+from utils.task_graph import TaskGraph, chain_future, when_all
+from utils.ticker_resolver import resolve_ticker
+from utils.tracing import ERROR, log
+
+# Worker threads per stage. LLM stages are kept small since Ollama serves a
+# limited number of requests in parallel; price fetches are network bound.
+STAGE_WORKERS = {
+    "analog_search": int(os.getenv("BATCH_ANALOG_SEARCH_WORKERS", "2")),
+    "date_inference": int(os.getenv("BATCH_DATE_INFERENCE_WORKERS", "4")),
+    "ticker_resolution": int(os.getenv("BATCH_TICKER_RESOLUTION_WORKERS", "4")),
+    "price_fetch": int(os.getenv("BATCH_PRICE_FETCH_WORKERS", "8")),
+    "synthesis": int(os.getenv("BATCH_SYNTHESIS_WORKERS", "2")),
+}
+
+
+def _competitor_insights(competitor, competitor_ticker, event_date):
+    if not competitor_ticker:
+        return {"error": f"Could not resolve a ticker for {competitor}."}
+    return get_stock_insights(competitor_ticker, event_date)
+
+
+def _schedule_competitor(graph, competitor, reasoning):
+    """
+    Schedules date inference, ticker resolution and the price fetch for one
+    competitor. Returns the (date, ticker, stock data) futures.
+    """
+    query = competitor_date_query(competitor, reasoning)
+    date_future = graph.submit("date_inference", query, lambda: infer_event_date(query))
+    ticker_future = graph.submit(
+        "ticker_resolution", competitor, lambda: resolve_ticker(competitor)
+    )
+
+    def make_price_task():
+        # Competitors resolving to the same ticker and date share one fetch
+        competitor_ticker = ticker_future.result()
+        event_date = date_future.result()
+        return (competitor_ticker or competitor, event_date), lambda: (
+            _competitor_insights(competitor, competitor_ticker, event_date)
+        )
+
+    price_future = graph.submit_after(
+        "price_fetch", [date_future, ticker_future], make_price_task
+    )
+    return date_future, ticker_future, price_future
+
+
+def schedule_event(graph, event, max_competitors=3):
+    """
+    Plans the analysis of one event on the task graph:
+    analog search -> date inference + ticker resolution -> price fetch -> synthesis.
+
+    Returns a future for (final_analysis, competitor_events).
+    """
+    company, description, ticker = event["company"], event["event"], event["ticker"]
+    result = Future()
+
+    event_date = event.get("date")
+    search_future = graph.submit(
+        "analog_search",
+        (description, max_competitors, company, event_date),
+        lambda: find_competitors(description, max_competitors, company, event_date),
+    )
+
+    def plan():
+        try:
+            competitors = search_future.result()
+        except Exception as e:
+            result.set_exception(e)
+            return
+
+        scheduled = [
+            (competitor, reasoning, _schedule_competitor(graph, competitor, reasoning))
+            for competitor, reasoning in competitors
+        ]
+
+        def make_synthesis_task():
+            competitor_events = [
+                {
+                    "competitor": competitor,
+                    "reasoning": reasoning,
+                    "event_date": date_future.result(),
+                    "ticker": ticker_future.result(),
+                    "stock_data": price_future.result(),
+                }
+                for competitor, reasoning, (
+                    date_future,
+                    ticker_future,
+                    price_future,
+                ) in scheduled
+            ]
+
+            def synthesize():
+                remember_competitor_events(competitor_events)
+                score_competitor_events(competitor_events)
+                analysis = synthesize_analysis(
+                    company, description, ticker, competitor_events
+                )
+                return analysis, competitor_events
+
+            return (company, description, ticker), synthesize
+
+        dependencies = [future for _, _, futures in scheduled for future in futures]
+        chain_future(
+            graph.submit_after("synthesis", dependencies, make_synthesis_task), result
+        )
+
+    when_all([search_future], plan)
+    return result
+
+
+def analyze_events(events, max_competitors=3, stage_workers=None):
+    """
+    Analyzes many events at once. Identical LLM requests and price windows
+    across events are merged, and independent stages run concurrently.
+
+    Args:
+        events (list): Dicts with 'company', 'event' and 'ticker' keys.
+
+    Returns:
+        list: One dict per event with the event fields plus either 'analysis'
+        and 'competitors', or 'error'.
+    """
+    graph = TaskGraph(stage_workers or STAGE_WORKERS)
+    futures = [schedule_event(graph, event, max_competitors) for event in events]
+
+    results = []
+    for event, future in zip(events, futures):
+        try:
+            analysis, competitor_events = future.result()
+            results.append(
+                {**event, "analysis": analysis, "competitors": competitor_events}
+            )
+        except Exception as e:
+            log(f"Error analyzing event for {event['company']}: {e}", ERROR)
+            results.append({**event, "error": str(e)})
+
+    graph.shutdown()
+    log("\n--- Batch Stage Summary ---")
+    for stage, counts in graph.summary().items():
+        log(f"{stage}: {counts['run']} run, {counts['merged']} merged")
+
+    return results
+
+
+def events_from_summaries(day, base_dir="daily_data", max_events_per_company=5):
+    """Builds events from the one-liners of every company summary of a day."""
+    from utils.vector_index import summary_events
+
+    events = []
+    pattern = os.path.join(base_dir, day, "*", "*_summary.txt")
+    for path in sorted(glob.glob(pattern)):
+        company = os.path.basename(os.path.dirname(path))
+        if os.path.basename(path) != f"{company}_summary.txt":
+            continue
+
+        ticker = resolve_ticker(company)
+        if not ticker:
+            log(f"Skipping {company}: could not resolve its ticker")
+            continue
+
+        with open(path, "r", encoding="utf-8") as f:
+            one_liners = summary_events(f.read())
+        events.extend(
+            {"company": company, "event": one_liner, "ticker": ticker, "date": day}
+            for one_liner in one_liners[:max_events_per_company]
+        )
+    return events
+
+
+def save_batch_results(results, day, base_dir="daily_data"):
+    """Writes the analyses of a day to <base_dir>/<day>/batch_analysis.json."""
+    output_path = os.path.join(base_dir, day, "batch_analysis.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    log(f"Saved {len(results)} analyses to {output_path}")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Analyze many company events in one run."
+    )
+    parser.add_argument(
+        "--events",
+        help="JSON file with a list of {company, event, ticker} objects, "
+        "optionally with the YYYY-MM-DD event date. "
+        "Defaults to the events in the day's summaries.",
+    )
+    parser.add_argument("--day", default=datetime.now().strftime("%Y-%m-%d"))
+    parser.add_argument("--max-competitors", type=int, default=3)
+    parser.add_argument("--max-events-per-company", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.events:
+        with open(args.events, "r", encoding="utf-8") as f:
+            events = json.load(f)
+    else:
+        events = events_from_summaries(
+            args.day, max_events_per_company=args.max_events_per_company
+        )
+
+    results = analyze_events(events, max_competitors=args.max_competitors)
+    save_batch_results(results, args.day)
@@ -0,0 +1,274 @@
+"""
+Local stand-ins for NewsAPI, Tavily, Firecrawl, Yahoo Finance and Ollama, used
+by the pipeline benchmark. Each fake sleeps for a configurable latency and
+returns deterministic synthetic data, so runs are repeatable offline.
+"""
+
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+import types
+from datetime import date, timedelta
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "revenue earnings guidance margin store sales quarter growth outlook "
+    "investors shares analysts demand costs pricing layoffs expansion supply "
+    "chain dividend buyback forecast restructuring market customers digital "
+    "loyalty coffee beverage international china union workers ceo strategy"
+).split()
+
+EMBEDDING_DIM = 64
+
+
+def _rng(*parts):
+    seed = hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def synthetic_text(seed, words):
+    """Returns `words` pseudo-random words; different seeds give unrelated texts."""
+    rng = _rng(seed)
+    sentences = []
+    for start in range(0, words, 12):
+        sentence = " ".join(rng.choice(WORDS) for _ in range(min(12, words - start)))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+class Latency:
+    """Per-service artificial latency in seconds."""
+
+    def __init__(self, api=0.0, llm=0.0):
+        self.api = api
+        self.llm = llm
+
+    def wait(self, kind):
+        seconds = self.llm if kind == "llm" else self.api
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FakeNewsResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.headers = {"Content-Type": "application/json"}
+        self.text = json.dumps(payload)
+        self.content = self.text.encode("utf-8")
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeNewsSession:
+    """Stands in for the requests session used by fetch_news."""
+
+    def __init__(self, latency, articles_per_company):
+        self.latency = latency
+        self.articles_per_company = articles_per_company
+
+    def get(self, url, timeout=None):
+        self.latency.wait("api")
+        query = parse_qs(urlparse(url).query)
+        company = query.get("q", [""])[0].split('"')[1]
+        slug = company.lower().replace(" ", "-")
+        articles = [
+            {
+                "title": f"{company} news {i}",
+                "url": f"https://news.example.com/{slug}/{i}",
+                "publishedAt": f"{date.today().isoformat()}T08:00:00Z",
+            }
+            for i in range(self.articles_per_company)
+        ]
+        return FakeNewsResponse({"status": "ok", "articles": articles})
+
+
+class FakeFirecrawlApp:
+    def __init__(self, latency, article_words):
+        self.latency = latency
+        self.article_words = article_words
+
+    def scrape_url(self, url, params=None):
+        self.latency.wait("api")
+        # Article text wrapped in the navigation, images and footer of a news page
+        menu = " | ".join(
+            f"[{word}](https://news.example.com/{word})" for word in WORDS[:10]
+        )
+        paragraphs = "\n\n".join(
+            synthetic_text((url, i), 60)
+            for i in range(max(1, self.article_words // 60))
+        )
+        markdown = (
+            f"{menu}\n\n![logo](https://news.example.com/logo.png)\n\n"
+            f"# {synthetic_text(url, 8)}\n\n{paragraphs}\n\n"
+            "Share this article\n\nSubscribe to our newsletter\n\n"
+            f"{menu}\n\nCopyright © 2025 All rights reserved."
+        )
+        return {"markdown": markdown, "metadata": {"sourceURL": url}}
+
+
+class FakeTavilyClient:
+    def __init__(self, latency, results=5):
+        self.latency = latency
+        self.results = results
+
+    def search(self, query):
+        self.latency.wait("api")
+        return {
+            "results": [
+                {
+                    "title": f"Search result {i}",
+                    "url": f"https://search.example.com/{_rng(query).getrandbits(32)}/{i}",
+                    "score": round(0.9 - i * 0.1, 2),
+                    "content": synthetic_text((query, i), 80),
+                }
+                for i in range(self.results)
+            ]
+        }
+
+
+def _structured_reply(schema):
+    """Canned JSON for the structured-output schemas of the pipeline."""
+    properties = schema.get("properties", {})
+    if "competitors" in properties:
+        competitors = [
+            {
+                "competitor": f"Competitor {letter}",
+                "reasoning": f"Competitor {letter} announced a similar event on "
+                f"2021-0{i + 3}-15 and its stock fell {i + 2}% that week.",
+            }
+            for i, letter in enumerate("ABC")
+        ]
+        return json.dumps({"competitors": competitors})
+    if "dates" in properties:
+        count = properties["dates"].get("maxItems", 1)
+        return json.dumps({"dates": [f"2021-0{i % 9 + 1}-15" for i in range(count)]})
+    return json.dumps({"date": "2021-03-15"})
+
+
+def _llm_reply(prompt):
+    """Free-text response for prompts without an output schema."""
+    return synthetic_text(prompt[-200:], 150)
+
+
+class FakeChatModel:
+    """Stands in for the LangChain ChatOllama model."""
+
+    def __init__(self, latency, model="fake-llm"):
+        self.latency = latency
+        self.model = model
+        self.temperature = None
+
+    def invoke(self, prompt):
+        self.latency.wait("llm")
+        return SimpleNamespace(content=_llm_reply(prompt))
+
+
+class FakeOllamaClient:
+    """Stands in for ollama.Client (chat, structured chat and embed)."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def chat(self, model, messages, format=None, options=None, keep_alive=None):
+        self.latency.wait("llm")
+        if isinstance(format, dict):
+            content = _structured_reply(format)
+            return {"message": {"role": "assistant", "content": content}}
+
+        prompt = messages[-1]["content"]
+        one_liners = "\n".join(
+            f"- {synthetic_text((prompt[-200:], i), 12)}" for i in range(5)
+        )
+        content = (
+            f"1. Essential one-liners:\n{one_liners}\n"
+            "2. Sentiment: neutral\n"
+            "3. Insights: none beyond the above."
+        )
+        return {"message": {"role": "assistant", "content": content}}
+
+    def generate(self, model, prompt="", keep_alive=None):
+        self.latency.wait("llm")
+        return {"model": model, "response": "", "done": True}
+
+    def embed(self, model, input, keep_alive=None):
+        self.latency.wait("llm")
+        return {
+            "embeddings": [
+                [_rng(text).gauss(0, 1) for _ in range(EMBEDDING_DIM)] for text in input
+            ]
+        }
+
+
+def synthetic_history(symbol, start, end):
+    """
+    Returns daily OHLCV bars for business days in [start, end). Each bar only
+    depends on the symbol and day, so overlapping windows agree on prices.
+    """
+    import pandas as pd
+
+    base = 50 + _rng(symbol).random() * 100
+    rows = []
+    day = date.fromisoformat(start)
+    while day < date.fromisoformat(end):
+        if day.weekday() < 5:
+            rng = _rng(symbol, day)
+            trend = 1 + 0.2 * math.sin(day.toordinal() / 20)
+            open_ = base * trend * (1 + rng.gauss(0, 0.01))
+            close = base * trend * (1 + rng.gauss(0, 0.01))
+            rows.append(
+                {
+                    "symbol": symbol,
+                    "date": day,
+                    "open": open_,
+                    "high": max(open_, close) * 1.01,
+                    "low": min(open_, close) * 0.99,
+                    "close": close,
+                    "volume": int(rng.uniform(1e6, 5e6)),
+                    "adjclose": close,
+                }
+            )
+        day += timedelta(days=1)
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index(["symbol", "date"])
+
+
+def fake_yahooquery(latency):
+    """Builds a module with the parts of yahooquery the pipeline uses."""
+    module = types.ModuleType("yahooquery")
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, start, end):
+            latency.wait("api")
+            return synthetic_history(self.symbol, start, end)
+
+    def search(name, quotes_count=5, news_count=0):
+        latency.wait("api")
+        symbol = "".join(part[:2] for part in name.upper().split())[:5]
+        return {"quotes": [{"symbol": symbol, "quoteType": "EQUITY", "longname": name}]}
+
+    module.Ticker = Ticker
+    module.search = search
+    return module
+
+
+def install_fakes(latency, articles_per_company=10, article_words=400):
+    """Routes every external service used by the pipeline to its local fake."""
+    from utils.clients import set_client
+
+    set_client("news_session", FakeNewsSession(latency, articles_per_company))
+    set_client("firecrawl", FakeFirecrawlApp(latency, article_words))
+    set_client("tavily", FakeTavilyClient(latency))
+    set_client("llm", FakeChatModel(latency))
+    set_client("ollama", FakeOllamaClient(latency))
+    sys.modules["yahooquery"] = fake_yahooquery(latency)
@@ -0,0 +1,82 @@
+"""
+Measures how long a fresh interpreter takes to import each entry point, so
+slow imports are caught before they reach the cron jobs.
+
+Run from the company_insights folder:
+
+    python benchmarks/import_time.py --repeat 5 --max-seconds 1.0
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ["fetch_news", "summarizer", "analogous_trades"]
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module, repeat):
+    """Returns the wall times, in seconds, of importing a module in new interpreters."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"], cwd=PACKAGE_DIR, check=True
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(module, top=5):
+    """Returns the (cumulative seconds, name) of the slowest imports from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Exit with an error if any median import time exceeds this.",
+    )
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_import("sys", args.repeat))
+    print(f"Interpreter startup: {baseline:.3f}s")
+
+    failed = False
+    for module in ENTRY_POINTS:
+        median = statistics.median(time_import(module, args.repeat))
+        print(f"\n{module}: {median:.3f}s ({median - baseline:.3f}s over startup)")
+        for seconds, name in slowest_imports(module):
+            print(f"    {seconds:.3f}s  {name}")
+
+        if args.max_seconds is not None and median > args.max_seconds:
+            failed = True
+
+    if failed:
+        print(f"\nAt least one entry point took longer than {args.max_seconds}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
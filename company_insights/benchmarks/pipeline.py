@@ -0,0 +1,166 @@
+"""
+Runs scrape_news, summarize_news and analyze_company_highlight end to end
+against local fakes of every external service, and reports throughput and
+per-stage latency percentiles as the number of companies and articles grows.
+
+Run from the company_insights folder:
+
+    python benchmarks/pipeline.py --companies 1,4,16 --articles 5,20
+
+Each scenario runs in a fresh interpreter inside an empty temporary
+directory, so caches and indexes start cold and runs are repeatable.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+
+def run_scenario(companies, articles, api_latency, llm_latency, concurrent):
+    """Runs the pipeline once in the current directory and returns its measurements."""
+    from fakes import Latency, install_fakes
+
+    install_fakes(Latency(api=api_latency, llm=llm_latency), articles)
+
+    import analogous_trades
+    import fetch_news
+    import summarizer
+    from utils import tracing
+
+    names = [f"Company {i:03d}" for i in range(companies)]
+    phases = {}
+
+    start = time.perf_counter()
+    if concurrent:
+        fetch_news.scrape_news_concurrent(names)
+    else:
+        fetch_news.scrape_news(names)
+    phases["scrape_news"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summarizer.summarize_news()
+    phases["summarize_news"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        analogous_trades.analyze_company_highlight(
+            name, f"{name} announces layoffs due to rising costs.", f"C{i:03d}"
+        )
+    phases["analyze_company_highlight"] = time.perf_counter() - start
+
+    return {
+        "companies": companies,
+        "articles": articles,
+        "phases": {
+            phase: {
+                "seconds": round(seconds, 4),
+                "companies_per_s": round(companies / seconds, 2) if seconds else None,
+            }
+            for phase, seconds in phases.items()
+        },
+        "stages": tracing.run_summary(),
+    }
+
+
+def spawn_scenario(companies, articles, args):
+    """Runs one scenario in a new interpreter and an empty working directory."""
+    from utils.concurrency import PROVIDER_RATE_LIMITS
+
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--scenario",
+        f"{companies},{articles}",
+        "--api-latency-ms",
+        str(args.api_latency_ms),
+        "--llm-latency-ms",
+        str(args.llm_latency_ms),
+    ]
+    if args.concurrent:
+        command.append("--concurrent")
+
+    env = dict(os.environ, COMPANY_INSIGHTS_VERBOSITY="0")
+    if not args.rate_limits:
+        # The fakes have no quotas, so measure the pipeline itself
+        for provider in PROVIDER_RATE_LIMITS:
+            env[f"{provider.upper()}_RATE_PER_SECOND"] = "0"
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            command, cwd=workdir, env=env, capture_output=True, text=True, check=True
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(result):
+    print(f"\n{result['companies']} companies x {result['articles']} articles")
+    for phase, entry in result["phases"].items():
+        print(
+            f"  {phase}: {entry['seconds']:.3f}s "
+            f"({entry['companies_per_s']} companies/s)"
+        )
+    for stage, entry in result["stages"].items():
+        hit_rate = entry.get("cache_hit_rate")
+        print(
+            f"    {stage:<22} n={entry['count']:<5} p50={entry['p50_s']:.4f}s "
+            f"p95={entry['p95_s']:.4f}s"
+            + (f" cache_hit_rate={hit_rate}" if hit_rate is not None else "")
+        )
+
+
+def _int_list(value):
+    return [int(part) for part in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--articles", type=_int_list, default=[5, 20])
+    parser.add_argument("--api-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Ingest with scrape_news_concurrent instead of scrape_news.",
+    )
+    parser.add_argument(
+        "--rate-limits",
+        action="store_true",
+        help="Keep the configured provider rate limits instead of disabling them.",
+    )
+    parser.add_argument("--output", help="Also write all results to this JSON file.")
+    parser.add_argument("--scenario", type=_int_list, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        companies, articles = args.scenario
+        result = run_scenario(
+            companies,
+            articles,
+            args.api_latency_ms / 1000,
+            args.llm_latency_ms / 1000,
+            args.concurrent,
+        )
+        print(json.dumps(result))
+        return
+
+    results = []
+    for companies in args.companies:
+        for articles in args.articles:
+            result = spawn_scenario(companies, articles, args)
+            report(result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,190 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
 from utils.news_api import fetch_news
 from utils.tavily_api import fetch_tavily_results
-from utils.file_manager import create_directory_structure, save_to_file
+from utils.article_cleaner import clean_article_in_pool
+from utils.daily_store import get_daily_store
 from utils.firecrawl_scraper import scrape_article
-
-
-def scrape_news():
-    companies = ["Starbucks"]
-
-    for company in companies:
-        print(f"Fetching news & search results for {company}...")
-
-        # Create folder structure
-        company_dir = create_directory_structure(company=company)
+from utils.scrape_index import get_scrape_index
+from utils.tracing import DEBUG, ERROR, log, span
+
+COMPANIES = ["Starbucks"]
+
+
+def save_article(store, company, article, full_content):
+    """Appends one scraped NewsAPI article to the daily store."""
+    store.append(
+        company,
+        "news",
+        {
+            "title": article.get("title", "No Title"),
+            "url": article.get("url", ""),
+            "published_at": article.get("publishedAt"),
+            "content": full_content,
+        },
+    )
+
+
+def save_search_results(store, company, query, search_results):
+    """Appends the individual Tavily search results to the daily store."""
+    for idx, result in enumerate(search_results):
+        store.append(
+            company,
+            "search",
+            {
+                "query": query,
+                "title": result.get("title", f"search_{idx}"),
+                "url": result.get("url", ""),
+                # Confidence score of relevance
+                "score": result.get("score", "N/A"),
+                # Use extracted content if available
+                "content": result.get("content", "No content available"),
+            },
+        )
+
+
+def scrape_unique_article(url, day, company):
+    """
+    Returns the content to store for an article URL, or None if it should be
+    dropped because it was stored for the company on an earlier day or copies
+    another article stored for it.
+
+    URLs already in the scrape index, including those scraped for other
+    companies, are answered from it instead of calling Firecrawl again. New
+    pages are cleaned down to the article text before they are indexed and
+    stored. Failed scrapes are not indexed, so they are retried on the next run.
+    """
+    index = get_scrape_index()
+    seen = index.company_record(company, url)
+    if seen is not None:
+        if seen["first_seen"] == day and seen["duplicate_of"] is None:
+            return index.lookup(url)["content"]
+        return None
+
+    record = index.lookup(url)
+    if record is not None:
+        content = record["content"]
+    else:
+        content = scrape_article(url)
+        if content.startswith("Error scraping"):
+            return content
+        with span("article.clean", bytes=len(content)) as current:
+            content = clean_article_in_pool(content)
+            current.set(cleaned_bytes=len(content))
+
+    duplicate_of = index.add(url, content, day, company)
+    if duplicate_of is not None:
+        log(f"Skipping {url} for {company}: duplicate of {duplicate_of}", DEBUG)
+        return None
+    return content
+
+
+def search_query_for(company):
+    return f"Tell me everything that happened with {company} in the past 7 days"
+
+
+def scrape_news(companies=None):
+    """Fetches, scrapes and saves news for each company, one call at a time."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    store = get_daily_store(day=today)
+
+    for company in companies or COMPANIES:
+        log(f"Fetching news & search results for {company}...")
 
         # Fetch recent news articles
         news_articles = fetch_news(company, days=7, num_results=10)
-        for idx, article in enumerate(news_articles):
-            title = article.get("title", "No Title")
+        for article in news_articles:
             url = article.get("url", "")
 
-            # Scrape full article content using Firecrawl
-            full_content = scrape_article(url) if url else "No URL available."
-
-            # Save scraped content
-            content = f"Title: {title}\nURL: {url}\n\n{full_content}"
-            save_to_file(company_dir, f"news_{idx}.txt", content)
+            # Scrape full article content using Firecrawl, skipping known articles
+            full_content = (
+                scrape_unique_article(url, today, company)
+                if url
+                else "No URL available."
+            )
+            if full_content is not None:
+                save_article(store, company, article, full_content)
 
         # Fetch Tavily search results
-        query = f"Tell me everything that happened with {company} in the past 7 days"
+        query = search_query_for(company)
         search_results = fetch_tavily_results(query)
-
-        # Save the full search result summary
-        search_summary_content = f"Tavily Search Query: {query}\n\n"
-
-        for idx, result in enumerate(search_results):
-            title = result.get("title", f"search_{idx}")
-            url = result.get("url", "")
-            content = result.get(
-                "content", "No content available"
-            )  # Use extracted content if available
-            score = result.get("score", "N/A")  # Confidence score of relevance
-
-            # Append result to the summary file
-            search_summary_content += f"Title: {title}\nURL: {url}\nRelevance Score: {score}\nSummary: {content[:500]}...\n\n"  # Truncate content
-
-            # Save individual search result file
-            search_result_content = f"Title: {title}\nURL: {url}\nRelevance Score: {score}\n\nFull Content:\n{content}"
-            save_to_file(company_dir, f"search_{idx}.txt", search_result_content)
-
-        # Save the overall search summary file
-        save_to_file(company_dir, "tavily_search_summary.txt", search_summary_content)
-
-        print(f"Data for {company} saved in {company_dir}")
+        save_search_results(store, company, query, search_results)
+
+        log(f"Data for {company} saved in {store.records_path}")
+
+
+def _scrape_company_concurrent(company, request_pool):
+    """
+    Fans out the NewsAPI, Firecrawl and Tavily calls for one company onto the
+    shared request pool and saves each result as soon as it completes.
+    """
+    log(f"Fetching news & search results for {company}...")
+    today = datetime.now().strftime("%Y-%m-%d")
+    store = get_daily_store(day=today)
+
+    query = search_query_for(company)
+    search_future = request_pool.submit(fetch_tavily_results, query)
+
+    news_articles = fetch_news(company, days=7, num_results=10)
+    article_futures = {}
+    for article in news_articles:
+        url = article.get("url", "")
+        if url:
+            future = request_pool.submit(scrape_unique_article, url, today, company)
+            article_futures[future] = article
+        else:
+            save_article(store, company, article, "No URL available.")
+
+    for future in as_completed(article_futures):
+        article = article_futures[future]
+        full_content = future.result()
+        if full_content is not None:
+            save_article(store, company, article, full_content)
+
+    save_search_results(store, company, query, search_future.result())
+
+    log(f"Data for {company} saved in {store.records_path}")
+
+
+def scrape_news_concurrent(companies=None, company_workers=8, request_workers=16):
+    """
+    Concurrent variant of scrape_news. Companies are processed in parallel by
+    `company_workers` threads, while article scrapes and Tavily searches share a
+    pool of `request_workers` threads. Per-provider limits from
+    utils.concurrency still cap how many requests hit each service at once.
+    """
+    with ThreadPoolExecutor(max_workers=request_workers) as request_pool:
+        with ThreadPoolExecutor(max_workers=company_workers) as company_pool:
+            futures = {
+                company_pool.submit(
+                    _scrape_company_concurrent, company, request_pool
+                ): company
+                for company in companies or COMPANIES
+            }
+            for future in as_completed(futures):
+                company = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    log(f"Error fetching news for {company}: {e}", ERROR)
 
 
 if __name__ == "__main__":
-    scrape_news()
+    parser = argparse.ArgumentParser(description="Fetch and save daily company news.")
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Fan out across companies and articles instead of running sequentially.",
+    )
+    parser.add_argument("--company-workers", type=int, default=8)
+    parser.add_argument("--request-workers", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.concurrent:
+        scrape_news_concurrent(
+            company_workers=args.company_workers, request_workers=args.request_workers
+        )
+    else:
+        scrape_news()
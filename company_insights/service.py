@@ -0,0 +1,272 @@
+import argparse
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.clients import LLM_MODEL, get_keep_alive, get_ollama_client, set_keep_alive
+from utils.concurrency import call_provider
+from utils.tracing import ERROR, log, reset, span, write_run_summary
+
+# Service mode keeps one process running instead of starting a fresh one per
+# cron run: API clients, caches, the event index and the Ollama models stay
+# resident, the daily pipeline runs on an in-process schedule and single
+# analyses can be requested over a local HTTP endpoint.
+DEFAULT_KEEP_ALIVE = "24h"
+DEFAULT_RUN_AT = "19:00"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def warm_models():
+    """Loads the chat and embedding models into Ollama with the current keep-alive."""
+    from utils.vector_index import EMBEDDING_MODEL
+
+    keep_alive = get_keep_alive()
+    with span("service.warmup", keep_alive=keep_alive):
+        # An empty prompt only loads the model
+        call_provider(
+            "ollama",
+            lambda: get_ollama_client().generate(
+                model=LLM_MODEL, prompt="", keep_alive=keep_alive
+            ),
+        )
+        call_provider(
+            "ollama",
+            lambda: get_ollama_client().embed(
+                model=EMBEDDING_MODEL, input=["warm up"], keep_alive=keep_alive
+            ),
+        )
+    log(f"Loaded {LLM_MODEL} and {EMBEDDING_MODEL} (keep-alive {keep_alive})")
+
+
+def next_run_time(run_at, now=None):
+    """Returns the next datetime at the HH:MM time of day `run_at`."""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in run_at.split(":"))
+    scheduled = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if scheduled <= now:
+        scheduled += timedelta(days=1)
+    return scheduled
+
+
+class InsightsService:
+    def __init__(self, run_at=DEFAULT_RUN_AT, concurrent=False, max_competitors=3):
+        self.run_at = run_at
+        self.concurrent = concurrent
+        self.max_competitors = max_competitors
+        self.next_run = None
+        self.last_run = None
+        self._pipeline_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scheduler = None
+
+    def run_pipeline(self):
+        """
+        Runs scrape_news, summarize_news and the batch analysis of the day's
+        events. Returns False without running if a run is already in progress.
+        """
+        if not self._pipeline_lock.acquire(blocking=False):
+            log("Pipeline run already in progress")
+            return False
+        self._run_locked()
+        return True
+
+    def run_pipeline_in_background(self):
+        """Starts a pipeline run in a thread unless one is already in progress."""
+        # Taken here rather than in the thread so concurrent requests cannot
+        # both start a run
+        if not self._pipeline_lock.acquire(blocking=False):
+            return False
+        threading.Thread(
+            target=self._run_locked, name="pipeline-run", daemon=True
+        ).start()
+        return True
+
+    def _run_locked(self):
+        """Runs the pipeline; the caller holds _pipeline_lock, released here."""
+        started = datetime.now()
+        day = started.strftime("%Y-%m-%d")
+        status = "ok"
+        try:
+            # Imported here so an import error still releases the lock below
+            from batch_analysis import (
+                analyze_events,
+                events_from_summaries,
+                save_batch_results,
+            )
+            from fetch_news import scrape_news, scrape_news_concurrent
+            from summarizer import summarize_news
+
+            with span("service.pipeline", day=day):
+                if self.concurrent:
+                    scrape_news_concurrent()
+                else:
+                    scrape_news()
+                summarize_news()
+                results = analyze_events(
+                    events_from_summaries(day), max_competitors=self.max_competitors
+                )
+                save_batch_results(results, day)
+        except Exception as e:
+            status = f"error: {e}"
+            log(f"Pipeline run failed: {e}", ERROR)
+        finally:
+            self.last_run = {
+                "started": started.isoformat(timespec="seconds"),
+                "finished": datetime.now().isoformat(timespec="seconds"),
+                "status": status,
+            }
+            # Report each run on its own instead of accumulating across days
+            write_run_summary()
+            reset()
+            self._pipeline_lock.release()
+
+    def _schedule_loop(self):
+        while not self._stop.is_set():
+            self.next_run = next_run_time(self.run_at)
+            log(f"Next pipeline run at {self.next_run:%Y-%m-%d %H:%M}")
+            if self._stop.wait((self.next_run - datetime.now()).total_seconds()):
+                break
+            self.run_pipeline()
+
+    def start_scheduler(self):
+        self._scheduler = threading.Thread(
+            target=self._schedule_loop, name="scheduler", daemon=True
+        )
+        self._scheduler.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self):
+        return {
+            "status": "running" if self._pipeline_lock.locked() else "idle",
+            "last_run": self.last_run,
+            "next_run": self.next_run.isoformat(timespec="seconds")
+            if self.next_run
+            else None,
+        }
+
+    def analyze(self, request):
+        """
+        Runs analyze_company_highlight for a {company, event, ticker} request
+        with an optional YYYY-MM-DD event "date".
+        """
+        from analogous_trades import analyze_company_highlight
+
+        missing = [
+            key for key in ("company", "event", "ticker") if not request.get(key)
+        ]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+        with span("service.analyze", company=request["company"]):
+            analysis, competitor_events = analyze_company_highlight(
+                request["company"],
+                request["event"],
+                request["ticker"],
+                event_date=request.get("date"),
+            )
+        return {"analysis": analysis, "competitors": competitor_events}
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, service.health())
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path == "/run":
+                started = service.run_pipeline_in_background()
+                self._reply(
+                    202 if started else 409,
+                    {"started": started, **service.health()},
+                )
+            elif self.path == "/analyze":
+                try:
+                    request = self._read_json()
+                    if not isinstance(request, dict):
+                        raise ValueError("Expected a JSON object")
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+                try:
+                    self._reply(200, service.analyze(request))
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                except Exception as e:
+                    log(f"Error analyzing {request.get('company')}: {e}", ERROR)
+                    self._reply(500, {"error": str(e)})
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def log_message(self, format, *args):
+            log(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline as a long-lived service with warm models."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--run-at",
+        default=DEFAULT_RUN_AT,
+        help="Local time of day (HH:MM) of the daily pipeline run.",
+    )
+    parser.add_argument(
+        "--no-schedule",
+        action="store_true",
+        help="Only serve requests; run the pipeline via POST /run.",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        default=get_keep_alive() or DEFAULT_KEEP_ALIVE,
+        help="How long Ollama keeps the models loaded, e.g. 24h or -1 for always.",
+    )
+    parser.add_argument("--concurrent", action="store_true")
+    parser.add_argument("--max-competitors", type=int, default=3)
+    args = parser.parse_args()
+
+    set_keep_alive(args.keep_alive)
+    try:
+        warm_models()
+    except Exception as e:
+        log(f"Could not warm up the models: {e}", ERROR)
+
+    service = InsightsService(
+        run_at=args.run_at,
+        concurrent=args.concurrent,
+        max_competitors=args.max_competitors,
+    )
+    if not args.no_schedule:
+        service.start_scheduler()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    log(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log("Shutting down")
+    finally:
+        service.stop()
+        server.server_close()
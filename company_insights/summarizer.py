@@ -1,30 +1,100 @@
+import argparse
 import os
-import glob
-import ollama
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from utils.clients import LLM_MODEL, get_keep_alive, get_ollama_client
+from utils.concurrency import call_provider
+from utils.daily_store import get_daily_store, record_text
 from utils.file_manager import save_to_file
-
-
-def load_text_files(directory):
-    """Loads all text files from a given directory and combines them into a list."""
-    file_paths = glob.glob(os.path.join(directory, "*.txt"))
-    articles = []
-    for file_path in file_paths:
-        with open(file_path, "r", encoding="utf-8") as f:
-            articles.append(f.read())
-    return articles
-
-
-def extract_key_insights(articles):
-    """Summarizes key points and extracts subtle insights using an LLM (Ollama)."""
-    combined_text = "\n\n".join(articles)  # Combine articles for LLM processing
-
-    prompt = f"""
+from utils.llm_cache import cached_completion
+from utils.tokens import estimate_tokens, pack_by_tokens, split_by_tokens
+from utils.tracing import ERROR, log, span
+
+SUMMARY_SUFFIX = "_summary.txt"
+MANIFEST_FILENAME = "summary_manifest.json"
+
+# Token budget for the news text of a single prompt, and the number of chunk
+# summaries requested from Ollama at once when articles exceed it.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "2"))
+
+# Ollama silently drops the start of prompts longer than its context window
+# (2048 or 4096 tokens by default), so summary requests ask for a window that
+# holds a full chunk, the instructions and the response. It is derived from
+# the chunk budget rather than from each prompt because Ollama reloads the
+# model whenever num_ctx changes.
+SUMMARY_INSTRUCTION_TOKENS = 256
+SUMMARY_RESPONSE_TOKENS = 1024
+
+
+def context_window(chunk_tokens):
+    """Returns the num_ctx for prompts holding up to chunk_tokens of news text."""
+    needed = chunk_tokens + SUMMARY_INSTRUCTION_TOKENS + SUMMARY_RESPONSE_TOKENS
+    return -(-needed // 1024) * 1024
+
+
+def summary_filename(company):
+    return f"{company}{SUMMARY_SUFFIX}"
+
+
+def load_text_files(store, company):
+    """Streams a company's scraped records from the daily store as plain text."""
+    for record in store.iter_records(company):
+        yield record_text(record)
+
+
+def input_hashes(store, company):
+    """Returns the content hashes of a company's records, read from the store index."""
+    return sorted(entry["sha256"] for entry in store.entries(company))
+
+
+def load_manifest(base_dir):
+    """Loads the per-day record of which inputs each company summary was built from."""
+    manifest_path = os.path.join(base_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(base_dir, manifest):
+    manifest_path = os.path.join(base_dir, MANIFEST_FILENAME)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+
+def _chat(prompt, num_ctx=None):
+    """Sends a single-turn prompt to Ollama, reusing cached responses."""
+    messages = [{"role": "user", "content": prompt}]
+    num_ctx = num_ctx or context_window(SUMMARY_CHUNK_TOKENS)
+    with span("ollama.chat", prompt_tokens=estimate_tokens(prompt)) as current:
+        response = cached_completion(
+            LLM_MODEL,
+            messages,
+            lambda: call_provider(
+                "ollama",
+                lambda: get_ollama_client().chat(
+                    model=LLM_MODEL,
+                    messages=messages,
+                    options={"num_ctx": num_ctx},
+                    keep_alive=get_keep_alive(),
+                ),
+            )["message"]["content"],
+            params={"num_ctx": num_ctx},
+        )
+        current.set(response_tokens=estimate_tokens(response))
+    return response.strip()
+
+
+def _insights_prompt(news_text):
+    return f"""
     Extract the essential one-liners summarizing key events in the business news. 
     Then, analyze the overall sentiment, financial tone, and any unique insights that a human might not recognize immediately.
 
     Here is the news data:
-    {combined_text}
+    {news_text}
 
     Provide:
     1. Essential one-liners for what happened.
@@ -32,34 +102,111 @@ def extract_key_insights(articles):
     3. Any unique or hidden insights.
     """
 
-    response = ollama.chat(
-        model="llama3.2", messages=[{"role": "user", "content": prompt}]
-    )
 
-    return response["message"]["content"].strip()
+def _summarize_chunk(chunk, num_ctx=None):
+    """Map step: condenses one chunk of articles into notes for the final summary."""
+    prompt = f"""
+    Below is one part of a larger set of business news articles about a company.
+    Write concise notes covering:
+    1. Every distinct event, as one line each, with dates and figures where given.
+    2. The sentiment and financial tone of this part (positive/negative/neutral).
+    3. Any subtle details that could matter to an investor.
+
+    Here is the news data:
+    {chunk}
+    """
+    return _chat(prompt, num_ctx)
+
+
+def extract_key_insights(
+    articles, chunk_tokens=SUMMARY_CHUNK_TOKENS, max_workers=SUMMARY_CONCURRENCY
+):
+    """
+    Summarizes key points and extracts subtle insights using an LLM (Ollama).
+    `articles` may be any iterable of texts, such as the load_text_files stream.
 
+    If the articles do not fit in `chunk_tokens`, they are split into chunks
+    that are summarized in parallel (map) and the partial summaries are then
+    combined into the final one-liners, sentiment and insights (reduce).
+    """
+    num_ctx = context_window(chunk_tokens)
+    chunks = pack_by_tokens(articles, chunk_tokens)
+    if len(chunks) <= 1:
+        return _chat(_insights_prompt("\n\n".join(chunks)), num_ctx)
+
+    # Partial summaries can themselves exceed the budget, so reduce in rounds
+    while len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            partial_summaries = list(
+                executor.map(lambda chunk: _summarize_chunk(chunk, num_ctx), chunks)
+            )
+        reduced = pack_by_tokens(partial_summaries, chunk_tokens)
+        if len(reduced) >= len(chunks):
+            # The partial summaries did not shrink. Cap each at half the budget
+            # so every prompt combines at least two and each round halves them.
+            half = (chunk_tokens - estimate_tokens("\n\n")) // 2
+            capped = [
+                (split_by_tokens(summary, half) or [""])[0]
+                for summary in partial_summaries
+            ]
+            reduced = pack_by_tokens(capped, chunk_tokens)
+        chunks = reduced
+
+    return _chat(_insights_prompt(chunks[0] if chunks else ""), num_ctx)
+
+
+def summarize_news(force=False):
+    """
+    Main function to aggregate and summarize the daily news insights.
 
-def summarize_news():
-    """Main function to aggregate and summarize the daily news insights."""
+    Only companies whose stored records changed since their last summary are
+    sent to the LLM, unless `force` is set.
+    """
     today = datetime.now().strftime("%Y-%m-%d")
-    base_dir = f"./daily_data/{today}"
+    store = get_daily_store(day=today)
+    base_dir = store.day_dir
 
-    companies = os.listdir(base_dir)  # Get company folders
+    manifest = load_manifest(base_dir)
 
-    for company in companies:
+    for company in store.companies():
         company_dir = os.path.join(base_dir, company)
-        if not os.path.isdir(company_dir):
+        output_filename = summary_filename(company)
+        hashes = input_hashes(store, company)
+        if (
+            not force
+            and manifest.get(company) == hashes
+            and os.path.exists(os.path.join(company_dir, output_filename))
+        ):
+            log(f"Summary for {company} is up to date")
             continue
 
-        articles = load_text_files(company_dir)
-        if not articles:
-            continue
+        with span("summarize", company=company):
+            summary = extract_key_insights(load_text_files(store, company))
+        os.makedirs(company_dir, exist_ok=True)
+        save_to_file(company_dir, output_filename, summary)
+
+        # Record progress after every company so a crash only loses the current one
+        manifest[company] = hashes
+        save_manifest(base_dir, manifest)
+
+        log(f"Summary saved for {company}")
 
-        summary = extract_key_insights(articles)
-        save_to_file(company_dir, f"{company}_summary.txt", summary)
+    # Make the new one-liners available as analogs for later analyses
+    try:
+        from utils.vector_index import update_event_index
 
-        print(f"Summary saved for {company}")
+        update_event_index()
+    except Exception as e:
+        log(f"Error updating the event index: {e}", ERROR)
 
 
 if __name__ == "__main__":
-    summarize_news()
+    parser = argparse.ArgumentParser(description="Summarize today's company news.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-summarize every company even if its inputs have not changed.",
+    )
+    args = parser.parse_args()
+
+    summarize_news(force=args.force)
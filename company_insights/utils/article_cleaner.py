@@ -0,0 +1,160 @@
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Scraped markdown is reduced to the article body before it is stored: images,
+# link targets, navigation menus, link farms and boilerplate lines (cookie
+# banners, newsletter prompts, share buttons...) are removed and the text is
+# capped. Cleaning is CPU bound, so it runs in a process pool off the threads
+# that wait on network requests.
+ARTICLE_MAX_CHARS = int(os.getenv("ARTICLE_MAX_CHARS", "12000"))
+ARTICLE_CLEANING_WORKERS = int(
+    os.getenv("ARTICLE_CLEANING_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\(([^)]*)\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+_HEADING = re.compile(r"^\s*#{1,6}\s+")
+_WORD = re.compile(r"\w+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_FIGURE = re.compile(r"[\d$€£¥%]")
+_BOILERPLATE = re.compile(
+    r"\b(subscribe|sign up|sign in|log in|newsletter|cookie|privacy policy|"
+    r"terms of (use|service)|all rights reserved|advertisement|sponsored|"
+    r"share (this|on)|follow us|read more|related (articles|stories|coverage)|"
+    r"recommended for you|most popular|trending now|skip to (main )?content|"
+    r"accept all|manage preferences|download the app|copyright ©?)\b",
+    re.IGNORECASE,
+)
+
+# Lines whose text is mostly link labels, or that hold several links and
+# little else, are navigation or link farms
+LINK_TEXT_RATIO = 0.6
+MAX_LINKS_PER_SHORT_LINE = 2
+SHORT_LINE_WORDS = 12
+# Share of a line's words taken by boilerplate phrases for it to be a banner
+# wherever it appears; above or below the article body, any short line with
+# such a phrase is dropped
+BOILERPLATE_WORD_RATIO = 0.5
+
+
+def _is_link_farm(line):
+    links = _LINK.findall(line)
+    if not links:
+        return False
+    words = len(_WORD.findall(_LINK.sub(r"\1", line)))
+    link_words = sum(len(_WORD.findall(text)) for text, _ in links)
+    if words and link_words / words >= LINK_TEXT_RATIO:
+        return True
+    return len(links) > MAX_LINKS_PER_SHORT_LINE and words < SHORT_LINE_WORDS * 2
+
+
+def _is_boilerplate(text, words, outside_body):
+    matches = [match.group(0) for match in _BOILERPLATE.finditer(text)]
+    if not matches:
+        return False
+    if outside_body and words < SHORT_LINE_WORDS:
+        return True
+    # Sentences that merely mention e.g. "advertisement revenue" are article text
+    phrase_words = sum(len(_WORD.findall(match)) for match in matches)
+    return phrase_words / words >= BOILERPLATE_WORD_RATIO
+
+
+def _truncate(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip() + "\n[truncated]"
+
+
+def clean_article(markdown, max_chars=ARTICLE_MAX_CHARS):
+    """Returns the article body of scraped markdown as plain, capped text."""
+    lines = []
+    for line in markdown.replace("\r\n", "\n").split("\n"):
+        line = _IMAGE.sub("", line)
+        if _is_link_farm(line):
+            continue
+        line = _HTML_TAG.sub("", _LINK.sub(r"\1", line))
+        line = _BARE_URL.sub("", line).strip()
+        text = _LIST_MARKER.sub("", _HEADING.sub("", line)).strip()
+        lines.append((line, text, len(_WORD.findall(text))))
+
+    # The article body spans from the first to the last paragraph-length line
+    body = [i for i, (_, _, words) in enumerate(lines) if words >= SHORT_LINE_WORDS]
+    body_start, body_end = (body[0], body[-1]) if body else (0, len(lines) - 1)
+
+    kept = []
+    seen = set()
+    for i, (line, text, words) in enumerate(lines):
+        if not line:
+            kept.append("")
+            continue
+        outside_body = i < body_start or i > body_end
+        if not words or _is_boilerplate(text, words, outside_body):
+            continue
+        # Very short list items are menu entries rather than article bullets,
+        # unless they carry figures like "Revenue: $40B"
+        if _LIST_MARKER.match(line) and words < 4 and not _FIGURE.search(text):
+            continue
+
+        is_heading = bool(_HEADING.match(line))
+        # Repeated lines are headers, footers or bylines echoed by the layout
+        key = text.lower()
+        if key in seen and not is_heading:
+            continue
+        seen.add(key)
+        kept.append(line)
+
+    text = _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+    return _truncate(text, max_chars)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit the state of the parent's threads
+            _pool = ProcessPoolExecutor(
+                max_workers=ARTICLE_CLEANING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def clean_article_in_pool(markdown, max_chars=ARTICLE_MAX_CHARS):
+    """
+    Cleans an article in the shared process pool and waits for the result, so
+    concurrent scraper threads do not contend for the GIL while cleaning. With
+    ARTICLE_CLEANING_WORKERS=0 the article is cleaned in this process.
+    """
+    if ARTICLE_CLEANING_WORKERS <= 0:
+        return clean_article(markdown, max_chars)
+    try:
+        return _get_pool().submit(clean_article, markdown, max_chars).result()
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; start a new one for later
+        # articles and clean this one here
+        _reset_pool()
+        return clean_article(markdown, max_chars)
@@ -0,0 +1,122 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# Clients for external services are created on first use and then reused, and
+# their libraries are imported only then. Entry points that never touch a
+# service do not pay for its imports, and a missing API key only fails the
+# call that needs it.
+load_dotenv()
+
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3.2")
+
+
+def _parse_keep_alive(value):
+    # Ollama reads bare numbers as seconds but only accepts them unquoted
+    if isinstance(value, str) and value.lstrip("-").isdigit():
+        return int(value)
+    return value or None
+
+
+# How long Ollama keeps a model loaded after a request, e.g. "30m", "24h" or -1
+# for indefinitely. None leaves the server default (5 minutes).
+_keep_alive = _parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_or_create(name, factory):
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def set_client(name, client):
+    """Replaces a shared client, e.g. with a stand-in for offline runs."""
+    with _clients_lock:
+        _clients[name] = client
+
+
+def reset_clients():
+    """Drops all shared clients so they are rebuilt on next use."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def get_keep_alive():
+    """Returns the keep-alive passed with every Ollama request."""
+    return _keep_alive
+
+
+def set_keep_alive(value):
+    """Changes the Ollama keep-alive, e.g. to keep models resident in service mode."""
+    global _keep_alive
+    with _clients_lock:
+        _keep_alive = _parse_keep_alive(value)
+        # The LangChain model carries the keep-alive, so rebuild it on next use
+        _clients.pop("llm", None)
+
+
+def _create_llm():
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(model=LLM_MODEL, keep_alive=get_keep_alive())
+
+
+def _create_ollama_client():
+    import ollama
+
+    return ollama.Client()
+
+
+def _create_tavily_client():
+    from tavily import TavilyClient
+
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+
+def _create_firecrawl_app():
+    from firecrawl import FirecrawlApp
+
+    return FirecrawlApp(api_key=os.getenv("FIRECRAWL_API_KEY"))
+
+
+def _create_news_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    from utils.concurrency import PROVIDER_CONCURRENCY
+
+    pool_size = PROVIDER_CONCURRENCY["newsapi"]
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def get_llm():
+    """Returns the shared LangChain ChatOllama model."""
+    return _get_or_create("llm", _create_llm)
+
+
+def get_ollama_client():
+    """Returns the shared Ollama client."""
+    return _get_or_create("ollama", _create_ollama_client)
+
+
+def get_tavily_client():
+    """Returns the shared Tavily client."""
+    return _get_or_create("tavily", _create_tavily_client)
+
+
+def get_firecrawl_app():
+    """Returns the shared Firecrawl app."""
+    return _get_or_create("firecrawl", _create_firecrawl_app)
+
+
+def get_news_session():
+    """Returns a shared requests session with a connection pool sized for NewsAPI."""
+    return _get_or_create("news_session", _create_news_session)
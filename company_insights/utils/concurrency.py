@@ -0,0 +1,242 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+from utils.tracing import DEBUG, annotate, log
+
+# Maximum number of in-flight requests per external provider. Override with
+# e.g. NEWSAPI_MAX_CONCURRENCY=8 in the environment.
+PROVIDER_CONCURRENCY = {
+    "newsapi": int(os.getenv("NEWSAPI_MAX_CONCURRENCY", "4")),
+    "firecrawl": int(os.getenv("FIRECRAWL_MAX_CONCURRENCY", "4")),
+    "tavily": int(os.getenv("TAVILY_MAX_CONCURRENCY", "4")),
+    "yahoo": int(os.getenv("YAHOO_MAX_CONCURRENCY", "4")),
+    "ollama": int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4")),
+}
+
+
+def _rate_limit(provider, rate, burst):
+    prefix = provider.upper()
+    return (
+        float(os.getenv(f"{prefix}_RATE_PER_SECOND", str(rate))),
+        float(os.getenv(f"{prefix}_BURST", str(burst))),
+    )
+
+
+# Sustained requests per second and burst size per provider. A rate of 0
+# disables the limit. Override with e.g. TAVILY_RATE_PER_SECOND=5.
+PROVIDER_RATE_LIMITS = {
+    "newsapi": _rate_limit("newsapi", 2, 4),
+    "firecrawl": _rate_limit("firecrawl", 1.5, 5),
+    "tavily": _rate_limit("tavily", 1.5, 5),
+    "yahoo": _rate_limit("yahoo", 2, 5),
+    "ollama": _rate_limit("ollama", 0, 1),
+}
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "30"))
+
+# Transient HTTP statuses; 429 additionally slows the provider's bucket down
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+_TRANSIENT_ERRORS = {
+    "ConnectionError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadError",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "Timeout",
+    "TimeoutError",
+    "TimeoutException",
+}
+# Exceptions that providers raise on a 429 without exposing the status code,
+# e.g. Tavily's UsageLimitExceededError
+_RATE_LIMIT_ERRORS = {"UsageLimitExceededError"}
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def _get_semaphore(provider):
+    with _semaphores_lock:
+        if provider not in _semaphores:
+            limit = PROVIDER_CONCURRENCY.get(provider, 4)
+            _semaphores[provider] = threading.BoundedSemaphore(max(1, limit))
+        return _semaphores[provider]
+
+
+@contextmanager
+def provider_slot(provider):
+    """Blocks until a concurrency slot for the given provider is free."""
+    semaphore = _get_semaphore(provider)
+    with semaphore:
+        yield
+
+
+class ProviderError(Exception):
+    """A failed provider response, raised so call_provider can retry it."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Hands out `rate` tokens per second with bursts of up to `capacity`.
+
+    On rate-limit responses the rate is halved (down to 1/16 of the configured
+    rate) and it then recovers by 5% of the configured rate per success, so the
+    bucket settles just below what the provider sustains.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available."""
+        if self.max_rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hands out no tokens for the next `seconds`, e.g. after a Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def throttle(self):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(provider):
+    """Returns the shared token bucket of a provider."""
+    with _buckets_lock:
+        if provider not in _buckets:
+            rate, burst = PROVIDER_RATE_LIMITS.get(provider, (0, 1))
+            _buckets[provider] = TokenBucket(rate, burst)
+        return _buckets[provider]
+
+
+def parse_retry_after(value):
+    """Converts a Retry-After header (seconds or HTTP date) to seconds, or None."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error):
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return parse_retry_after(headers.get("Retry-After"))
+
+
+def _is_rate_limited(error):
+    if _status_code(error) == 429 or type(error).__name__ in _RATE_LIMIT_ERRORS:
+        return True
+    message = str(error).lower()
+    return "rate limit" in message or "too many requests" in message
+
+
+def is_retryable(error):
+    """Whether an error from a provider call is transient and worth retrying."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in _TRANSIENT_ERRORS or _is_rate_limited(error)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given (1-based) retry attempt."""
+    ceiling = min(
+        RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)
+    )
+    return random.uniform(0, ceiling)
+
+
+def call_provider(provider, fn, max_attempts=RETRY_MAX_ATTEMPTS):
+    """
+    Calls fn() within the provider's rate and concurrency limits, retrying
+    transient failures with jittered exponential backoff. A Retry-After from
+    the provider pauses every caller of that provider, not just this one.
+
+    Raises the last error once the attempts are used up, the error is not
+    transient, or the provider asks to wait longer than RETRY_MAX_DELAY_SECONDS.
+    """
+    bucket = get_bucket(provider)
+    for attempt in range(1, max_attempts + 1):
+        bucket.acquire()
+        try:
+            with provider_slot(provider):
+                result = fn()
+        except Exception as e:
+            if attempt == max_attempts or not is_retryable(e):
+                raise
+            retry_after = _retry_after(e)
+            if retry_after is not None and retry_after > RETRY_MAX_DELAY_SECONDS:
+                raise
+            if _is_rate_limited(e):
+                bucket.throttle()
+            if retry_after is not None:
+                bucket.pause(retry_after)
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+
+            annotate(retries=attempt)
+            log(f"{provider} request failed ({e}); retrying in {delay:.1f}s", DEBUG)
+            time.sleep(delay)
+        else:
+            bucket.recover()
+            return result
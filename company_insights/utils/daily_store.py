@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+# Each day's scraped records live in one append-only file of gzip members, one
+# member per record, next to a JSON-lines index giving the company, source,
+# byte offset, length and content hash of every member. Records for one
+# company and source can therefore be read without decompressing the rest.
+# The record is written before its index entry, so after a crash mid-append
+# the store is repaired on open: a truncated index line or an entry pointing
+# past the end of the records file is dropped, along with unindexed bytes.
+RECORDS_FILENAME = "records.jsonl.gz"
+INDEX_FILENAME = "records.index.jsonl"
+
+
+class DailyStore:
+    """Append-only compressed store of one day's scraped records."""
+
+    def __init__(self, day_dir):
+        self.day_dir = day_dir
+        self.records_path = os.path.join(day_dir, RECORDS_FILENAME)
+        self.index_path = os.path.join(day_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._entries = defaultdict(list)
+        self._hashes = defaultdict(set)
+
+        if os.path.exists(self.index_path):
+            self._load_index()
+
+    def _load_index(self):
+        records_size = (
+            os.path.getsize(self.records_path)
+            if os.path.exists(self.records_path)
+            else 0
+        )
+        entries = []
+        damaged = False
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    damaged = True
+                    continue
+                if not line.endswith("\n") or (
+                    entry["offset"] + entry["length"] > records_size
+                ):
+                    damaged = True
+                    continue
+                entries.append(entry)
+
+        end = max((e["offset"] + e["length"] for e in entries), default=0)
+        if damaged or end < records_size:
+            self._repair(entries, end)
+        for entry in entries:
+            self._add_entry(entry)
+
+    def _repair(self, entries, records_end):
+        """Rewrites the index with its valid entries and drops unindexed bytes."""
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+        os.replace(tmp_path, self.index_path)
+        if os.path.exists(self.records_path):
+            with open(self.records_path, "r+b") as f:
+                f.truncate(records_end)
+
+    def _add_entry(self, entry):
+        key = (entry["company"], entry["source"])
+        self._entries[key].append(entry)
+        self._hashes[key].add(entry["sha256"])
+
+    def append(self, company, source, record):
+        """
+        Appends a record (a JSON-serializable dict) for a company and source.
+        Records identical to one already stored for the same company and source
+        are skipped, so reruns do not grow the file. Returns True if written.
+        """
+        record = {"company": company, "source": source, **record}
+        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        member = gzip.compress(data + b"\n")
+
+        with self._lock:
+            if digest in self._hashes[(company, source)]:
+                return False
+
+            os.makedirs(self.day_dir, exist_ok=True)
+            with open(self.records_path, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+
+            entry = {
+                "company": company,
+                "source": source,
+                "offset": offset,
+                "length": len(member),
+                "sha256": digest,
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._add_entry(entry)
+        return True
+
+    def companies(self):
+        with self._lock:
+            return sorted({company for company, _ in self._entries})
+
+    def entries(self, company, source=None):
+        """Returns the index entries for a company, optionally for one source."""
+        with self._lock:
+            return [
+                entry
+                for (entry_company, entry_source), entries in self._entries.items()
+                if entry_company == company and source in (None, entry_source)
+                for entry in entries
+            ]
+
+    def iter_records(self, company, source=None):
+        """Streams the stored records for a company in the order they were written."""
+        entries = sorted(self.entries(company, source), key=lambda e: e["offset"])
+        if not entries:
+            return
+
+        with open(self.records_path, "rb") as f:
+            for entry in entries:
+                f.seek(entry["offset"])
+                data = gzip.decompress(f.read(entry["length"]))
+                yield json.loads(data)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_daily_store(base_dir="daily_data", day=None):
+    """Returns the shared store for a day (today by default)."""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    day_dir = os.path.join(base_dir, day)
+    with _stores_lock:
+        if day_dir not in _stores:
+            _stores[day_dir] = DailyStore(day_dir)
+        return _stores[day_dir]
+
+
+def record_text(record):
+    """Renders a stored record as the plain text the summarizer reads."""
+    if record["source"] == "search":
+        return (
+            f"Title: {record['title']}\nURL: {record['url']}\n"
+            f"Relevance Score: {record['score']}\n\nFull Content:\n{record['content']}"
+        )
+    return f"Title: {record['title']}\nURL: {record['url']}\n\n{record['content']}"
@@ -0,0 +1,263 @@
+import calendar
+import os
+import re
+from datetime import date, timedelta
+
+# Event dates are read from the competitor reasoning with precompiled patterns
+# before an LLM is asked. Every date-like phrase becomes a candidate scored by
+# how precise it is (a full date beats a month, a quarter or a bare year) and
+# whether the text contradicts it; the LLM is only called when no candidate
+# reaches DATE_RULES_MIN_CONFIDENCE.
+DATE_RULES_MIN_CONFIDENCE = float(os.getenv("DATE_RULES_MIN_CONFIDENCE", "0.8"))
+
+# Base confidence per precision. Vague dates stand in for the middle of their
+# period so price windows around them still cover the event.
+PRECISION_CONFIDENCE = {
+    "day": 0.95,
+    "month": 0.6,
+    "quarter": 0.45,
+    "year": 0.25,
+    # Relative phrases are resolved against today, while the text may describe
+    # a past event, so they rank below any absolute date
+    "relative_day": 0.2,
+    "relative_period": 0.15,
+}
+# Numeric dates such as 04/05/2021 may be month- or day-first
+AMBIGUOUS_NUMERIC_PENALTY = 0.25
+# When a text holds several full dates, the first one marked by an event cue
+# (or else the first one mentioned) is taken as the event date and the later
+# ones, typically when the stock moved, are ranked below it
+COMPETING_DATE_PENALTY = 0.3
+# Phrases right before a date that mark it as the event's date
+EVENT_CUE_BONUS = 0.05
+EARLIEST_YEAR = 1900
+
+_MONTHS = {
+    name.lower(): number
+    for number in range(1, 13)
+    for name in (calendar.month_name[number], calendar.month_abbr[number])
+}
+_MONTHS["sept"] = 9
+_MONTH = r"(?P<month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"(?P<day>[0-3]?\d)(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>(?:19|20)\d{2})"
+
+_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4}
+_NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+}
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+# (kind, pattern), most specific first. Spans matched by an earlier
+# pattern are not matched again, so "March 2023" inside "March 5, 2023" is
+# not counted as a second date.
+_PATTERNS = [
+    ("iso", re.compile(rf"\b{_YEAR}[-/.](?P<month>[01]?\d)[-/.](?P<day>[0-3]?\d)\b")),
+    (
+        "month_day_year",
+        re.compile(rf"\b{_MONTH}\s+{_DAY},?\s+{_YEAR}\b", re.IGNORECASE),
+    ),
+    (
+        "day_month_year",
+        re.compile(rf"\b{_DAY}(?:\s+of)?\s+{_MONTH},?\s+{_YEAR}\b", re.IGNORECASE),
+    ),
+    (
+        "numeric",
+        re.compile(rf"\b(?P<first>[0-3]?\d)[/.-](?P<second>[0-3]?\d)[/.-]{_YEAR}\b"),
+    ),
+    ("month_year", re.compile(rf"\b{_MONTH}(?:\s+of)?,?\s+{_YEAR}\b", re.IGNORECASE)),
+    (
+        "quarter",
+        re.compile(
+            r"\b(?:(?:Q|quarter\s*)(?P<q1>[1-4])|(?P<q2>[1-4])Q|"
+            r"(?P<q3>first|second|third|fourth)[\s-]+quarter)"
+            # Two-digit years only when written as '22, FY22 or 3Q22
+            r"(?:(?:\s+of)?(?:\s+fiscal)?,?\s+(?:FY\s*)?(?P<year>(?:19|20)\d{2})"
+            r"|(?:\s*'|\s*FY\s*|)(?P<short_year>\d{2}))\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "relative_day",
+        re.compile(r"\b(?P<word>today|yesterday)\b", re.IGNORECASE),
+    ),
+    (
+        "relative_ago",
+        re.compile(
+            r"\b(?P<count>\d+|an?|one|two|three|four|five|six|seven|eight|nine|ten)"
+            r"\s+(?P<unit>day|week|month|year)s?\s+ago\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "relative_last",
+        re.compile(
+            r"\b(?:last|past|previous)\s+(?P<unit>week|month|year)\b", re.IGNORECASE
+        ),
+    ),
+    ("year", re.compile(rf"(?<![\d/.-]){_YEAR}(?![\d/-])")),
+]
+
+_EVENT_CUE = re.compile(
+    r"\b(?:on|dated?|as of|announced|reported|occurred|happened|took place|"
+    r"effective|released|filed|disclosed)\s*(?:on\s*)?$",
+    re.IGNORECASE,
+)
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _mid_month(year, month):
+    return date(year, month, min(15, calendar.monthrange(year, month)[1]))
+
+
+def _full_year(year):
+    year = int(year)
+    return year + 2000 if year < 100 else year
+
+
+def _parse(kind, match, reference):
+    """Returns (date, precision, ambiguous) for a pattern match, or None."""
+    groups = match.groupdict()
+    if kind in ("iso", "month_day_year", "day_month_year"):
+        month = groups["month"]
+        month = int(month) if month.isdigit() else _MONTHS[month.lower()]
+        parsed = _safe_date(int(groups["year"]), month, int(groups["day"]))
+        return parsed and (parsed, "day", False)
+
+    if kind == "numeric":
+        first, second = int(groups["first"]), int(groups["second"])
+        year = int(groups["year"])
+        # Month first, as in US sources, unless that is impossible
+        parsed = _safe_date(year, first, second) or _safe_date(year, second, first)
+        ambiguous = first != second and first <= 12 and second <= 12
+        return parsed and (parsed, "day", ambiguous)
+
+    if kind == "month_year":
+        month = _MONTHS[groups["month"].lower()]
+        return _mid_month(int(groups["year"]), month), "month", False
+
+    if kind == "quarter":
+        quarter = groups["q1"] or groups["q2"] or _ORDINALS[groups["q3"].lower()]
+        # Middle month of the quarter
+        year = _full_year(groups["year"] or groups["short_year"])
+        return _mid_month(year, int(quarter) * 3 - 1), "quarter", False
+
+    if kind == "relative_day":
+        days = 1 if groups["word"].lower() == "yesterday" else 0
+        return reference - timedelta(days=days), "relative_day", False
+
+    if kind == "relative_ago":
+        count = groups["count"].lower()
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        days = count * _UNIT_DAYS[groups["unit"].lower()]
+        precision = (
+            "relative_day" if groups["unit"].lower() == "day" else "relative_period"
+        )
+        return reference - timedelta(days=days), precision, False
+
+    if kind == "relative_last":
+        return (
+            reference - timedelta(days=_UNIT_DAYS[groups["unit"].lower()]),
+            "relative_period",
+            False,
+        )
+
+    if kind == "year":
+        return date(int(groups["year"]), 7, 1), "year", False
+    return None
+
+
+def date_candidates(text, reference=None):
+    """
+    Finds every date-like phrase in text and scores it.
+
+    Relative phrases ("yesterday", "3 weeks ago", "last month") are resolved
+    against `reference`, today by default. Dates after the reference or
+    before EARLIEST_YEAR are ignored.
+
+    Returns:
+        list: Dicts with 'date' (YYYY-MM-DD), 'precision', 'confidence', the
+        matched 'text' and its 'position', most confident first.
+    """
+    reference = reference or date.today()
+    taken = []
+    candidates = []
+    for kind, pattern in _PATTERNS:
+        for match in pattern.finditer(text or ""):
+            start, end = match.span()
+            if any(start < t_end and t_start < end for t_start, t_end in taken):
+                continue
+            parsed = _parse(kind, match, reference)
+            if not parsed:
+                continue
+            taken.append((start, end))
+            found, precision, ambiguous = parsed
+            if found > reference or found.year < EARLIEST_YEAR:
+                continue
+
+            confidence = PRECISION_CONFIDENCE[precision]
+            if ambiguous:
+                confidence -= AMBIGUOUS_NUMERIC_PENALTY
+            cued = bool(_EVENT_CUE.search(text[max(0, start - 30) : start]))
+            if cued:
+                confidence += EVENT_CUE_BONUS
+            candidates.append(
+                {
+                    "date": found,
+                    "precision": precision,
+                    "confidence": confidence,
+                    "text": match.group(0),
+                    "position": start,
+                    "cued": cued,
+                }
+            )
+
+    full_dates = sorted(
+        (c for c in candidates if c["precision"] == "day"),
+        key=lambda c: (not c["cued"], c["position"]),
+    )
+    precise = {c["date"] for c in full_dates}
+    for candidate in candidates:
+        if candidate["precision"] == "day":
+            if candidate["date"] != full_dates[0]["date"]:
+                candidate["confidence"] -= COMPETING_DATE_PENALTY
+        elif any(_within_period(day, candidate) for day in precise):
+            # A vaguer mention of a precise date's period only confirms it
+            candidate["confidence"] = 0.0
+
+    for candidate in candidates:
+        candidate["confidence"] = round(min(1.0, max(0.0, candidate["confidence"])), 2)
+        candidate["date"] = candidate["date"].isoformat()
+        del candidate["cued"]
+    return sorted(candidates, key=lambda c: (-c["confidence"], c["position"]))
+
+
+def _within_period(day, candidate):
+    approximate = candidate["date"]
+    if candidate["precision"] == "month":
+        return (day.year, day.month) == (approximate.year, approximate.month)
+    if candidate["precision"] == "quarter":
+        return (
+            day.year == approximate.year
+            and (day.month - 1) // 3 == (approximate.month - 1) // 3
+        )
+    if candidate["precision"] == "year":
+        return day.year == approximate.year
+    return False
@@ -0,0 +1,259 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+# Market-model event study: for each event, alpha and beta of the stock's daily
+# returns against a benchmark are estimated over a window before the event, and
+# abnormal returns (actual minus predicted) are summed over each event window.
+# Windows are in trading days relative to the event day (day 0), which is the
+# first trading day on or after the event date.
+BENCHMARK = os.getenv("EVENT_STUDY_BENCHMARK", "SPY")
+ESTIMATION_WINDOW = (-250, -30)
+EVENT_WINDOWS = ((-1, 1), (0, 5), (-5, 5), (0, 20))
+
+# Fewest valid estimation-window returns needed to fit the market model
+MIN_ESTIMATION_DAYS = 60
+HISTORY_FETCH_CONCURRENCY = int(os.getenv("HISTORY_FETCH_CONCURRENCY", "4"))
+
+
+def daily_returns(prices):
+    """Simple returns along the last axis; the first column is NaN."""
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = np.full(prices.shape, np.nan)
+    returns[..., 1:] = prices[..., 1:] / prices[..., :-1] - 1
+    return returns
+
+
+def gather_windows(returns, rows, event_positions, start, end):
+    """
+    Cuts each event's returns for relative days start..end out of an aligned
+    (symbols, dates) returns matrix. Returns an (events, end - start + 1)
+    matrix, NaN where the window runs past the available dates.
+    """
+    offsets = np.arange(start, end + 1)
+    columns = np.asarray(event_positions)[:, None] + offsets
+    valid = (columns >= 0) & (columns < returns.shape[1])
+    windows = returns[
+        np.asarray(rows)[:, None], np.clip(columns, 0, returns.shape[1] - 1)
+    ]
+    return np.where(valid, windows, np.nan)
+
+
+def market_model(
+    stock_returns,
+    market_returns,
+    estimation_window=ESTIMATION_WINDOW,
+    event_windows=EVENT_WINDOWS,
+    offset=None,
+):
+    """
+    Computes market-model abnormal returns for many events at once.
+
+    Args:
+        stock_returns, market_returns (np.ndarray): (events, days) returns,
+            where column j is relative day `offset + j`.
+        offset (int): Relative day of the first column; defaults to the start
+            of the estimation window.
+
+    Returns:
+        dict of arrays: 'alpha', 'beta', 'sigma' and 'estimation_days' per
+        event, 'abnormal_returns' (events, days), and per event window
+        'car' and 't_stat' (events, windows).
+    """
+    offset = estimation_window[0] if offset is None else offset
+    r = np.asarray(stock_returns, dtype=np.float64)
+    m = np.asarray(market_returns, dtype=np.float64)
+
+    est = slice(estimation_window[0] - offset, estimation_window[1] - offset + 1)
+    r_est, m_est = r[:, est], m[:, est]
+    mask = np.isfinite(r_est) & np.isfinite(m_est)
+    n = mask.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r_mean = np.where(mask, r_est, 0).sum(axis=1) / n
+        m_mean = np.where(mask, m_est, 0).sum(axis=1) / n
+        r_dev = np.where(mask, r_est - r_mean[:, None], 0)
+        m_dev = np.where(mask, m_est - m_mean[:, None], 0)
+        beta = (r_dev * m_dev).sum(axis=1) / (m_dev**2).sum(axis=1)
+        alpha = r_mean - beta * m_mean
+        residuals = r_dev - beta[:, None] * m_dev
+        sigma = np.sqrt((residuals**2).sum(axis=1) / (n - 2))
+
+        insufficient = n < MIN_ESTIMATION_DAYS
+        alpha[insufficient] = beta[insufficient] = sigma[insufficient] = np.nan
+
+        abnormal = r - (alpha[:, None] + beta[:, None] * m)
+
+        cars, t_stats = [], []
+        for start, end in event_windows:
+            window = abnormal[:, start - offset : end - offset + 1]
+            days = np.isfinite(window).sum(axis=1)
+            car = np.where(days > 0, np.nansum(window, axis=1), np.nan)
+            cars.append(car)
+            t_stats.append(car / (sigma * np.sqrt(days)))
+
+    return {
+        "alpha": alpha,
+        "beta": beta,
+        "sigma": sigma,
+        "estimation_days": n,
+        "abnormal_returns": abnormal,
+        "car": np.stack(cars, axis=1),
+        "t_stat": np.stack(t_stats, axis=1),
+    }
+
+
+def aligned_closes(histories, benchmark):
+    """
+    Aligns adjusted closes of several symbols on the benchmark's trading days.
+
+    Args:
+        histories (dict): symbol -> DataFrame from price_cache.get_history.
+
+    Returns:
+        (symbols, dates, prices): the symbol order, a datetime64[D] array of
+        trading days and a (symbols, dates) price matrix, NaN where missing.
+    """
+    import pandas as pd
+
+    frames = []
+    for symbol, history in histories.items():
+        if history is None or history.empty:
+            continue
+        column = "adjclose" if "adjclose" in history.columns else "close"
+        frames.append(
+            pd.DataFrame(
+                {
+                    "symbol": symbol,
+                    "date": pd.to_datetime(history["date"]),
+                    "price": history[column].astype("float64"),
+                }
+            )
+        )
+    if not frames:
+        return [], np.array([], dtype="datetime64[D]"), np.empty((0, 0))
+
+    table = pd.concat(frames, ignore_index=True).pivot_table(
+        index="symbol", columns="date", values="price", aggfunc="last"
+    )
+    if benchmark in table.index:
+        # Trading days are those of the benchmark
+        table = table.loc[:, table.loc[benchmark].notna()]
+    dates = table.columns.values.astype("datetime64[D]")
+    return list(table.index), dates, table.to_numpy(dtype=np.float64)
+
+
+def _fetch_range(event_dates, estimation_window, event_windows):
+    # Trading days are about 5/7 of calendar days; pad for holidays
+    days_before = math.ceil(-estimation_window[0] * 7 / 5) + 14
+    days_after = math.ceil(max(end for _, end in event_windows) * 7 / 5) + 14
+    first = min(event_dates) - timedelta(days=days_before)
+    last = max(event_dates) + timedelta(days=days_after + 1)
+    return first.isoformat(), last.isoformat()
+
+
+def load_histories(symbol_dates, estimation_window, event_windows):
+    """Fetches, per symbol, one history covering all of its events' windows."""
+    from utils.price_cache import get_history
+
+    def fetch(item):
+        symbol, event_dates = item
+        start, end = _fetch_range(event_dates, estimation_window, event_windows)
+        return symbol, get_history(symbol, start, end)
+
+    with ThreadPoolExecutor(max_workers=HISTORY_FETCH_CONCURRENCY) as executor:
+        return dict(executor.map(fetch, symbol_dates.items()))
+
+
+def event_study(
+    events,
+    benchmark=BENCHMARK,
+    estimation_window=ESTIMATION_WINDOW,
+    event_windows=EVENT_WINDOWS,
+):
+    """
+    Computes market-model abnormal returns for many (ticker, YYYY-MM-DD)
+    events at once. Prices come from the local price cache, one fetch per
+    symbol, and all events are then scored in a few array operations.
+
+    Returns:
+        list: One dict per event, in order, with 'alpha', 'beta',
+        'estimation_days' and per window 'car' and 't_stat' keyed like
+        "[-1, 1]" (CARs in percent), or an 'error'.
+    """
+    parsed = []
+    for ticker, event_date in events:
+        try:
+            parsed.append((ticker, date.fromisoformat(event_date)))
+        except (TypeError, ValueError):
+            parsed.append((ticker, None))
+
+    symbol_dates = {}
+    for ticker, event_date in parsed:
+        if ticker and event_date:
+            symbol_dates.setdefault(ticker, []).append(event_date)
+    if not symbol_dates:
+        return [{"error": "No event with both a ticker and a date."} for _ in events]
+    all_dates = [d for dates in symbol_dates.values() for d in dates]
+    symbol_dates.setdefault(benchmark, []).extend([min(all_dates), max(all_dates)])
+
+    histories = load_histories(symbol_dates, estimation_window, event_windows)
+    symbols, dates, prices = aligned_closes(histories, benchmark)
+    if benchmark not in symbols:
+        return [{"error": f"No price data for benchmark {benchmark}."} for _ in events]
+
+    returns = daily_returns(prices)
+    row_of = {symbol: i for i, symbol in enumerate(symbols)}
+    scored = [
+        i
+        for i, (ticker, event_date) in enumerate(parsed)
+        if ticker in row_of and event_date is not None
+    ]
+    if scored:
+        rows = np.array([row_of[parsed[i][0]] for i in scored])
+        event_days = np.array([parsed[i][1] for i in scored], dtype="datetime64[D]")
+        positions = np.searchsorted(dates, event_days, side="left")
+
+        start = estimation_window[0]
+        end = max(window_end for _, window_end in event_windows)
+        stock = gather_windows(returns, rows, positions, start, end)
+        market = gather_windows(
+            returns, np.full(len(rows), row_of[benchmark]), positions, start, end
+        )
+        model = market_model(stock, market, estimation_window, event_windows)
+
+    results = [None] * len(events)
+    for k, i in enumerate(scored):
+        if not np.isfinite(model["beta"][k]):
+            results[i] = {
+                "error": "Not enough price history before the event to fit the market model."
+            }
+            continue
+        result = {
+            "alpha": round(float(model["alpha"][k]), 6),
+            "beta": round(float(model["beta"][k]), 3),
+            "estimation_days": int(model["estimation_days"][k]),
+        }
+        for w, window in enumerate(event_windows):
+            car = model["car"][k, w]
+            t_stat = model["t_stat"][k, w]
+            result[str(list(window))] = {
+                "car": round(float(car) * 100, 2) if np.isfinite(car) else None,
+                "t_stat": round(float(t_stat), 2) if np.isfinite(t_stat) else None,
+            }
+        results[i] = result
+
+    for i, (ticker, event_date) in enumerate(parsed):
+        if results[i] is None:
+            if not ticker:
+                reason = "No ticker for the event."
+            elif event_date is None:
+                reason = "No valid event date."
+            else:
+                reason = f"No price data for {ticker}."
+
+            results[i] = {"error": reason}
+    return results
@@ -1,11 +1,13 @@
-import os
-from firecrawl import FirecrawlApp
+from utils.clients import get_firecrawl_app
+from utils.concurrency import call_provider
+from utils.tracing import span
 
-# Load Firecrawl API Key from environment variables
-FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 
-# Initialize Firecrawl App
-app = FirecrawlApp(api_key=FIRECRAWL_API_KEY)
+def _markdown(scrape_result):
+    """Returns the markdown body of a Firecrawl scrape result (a dict or an object)."""
+    if isinstance(scrape_result, dict):
+        return scrape_result.get("markdown")
+    return getattr(scrape_result, "markdown", None)
 
 
 def scrape_article(url):
@@ -16,11 +18,23 @@ def scrape_article(url):
         url (str): The URL of the article to scrape.
 
     Returns:
-        str: Scraped article content in markdown format, or an error message.
+        str: The raw markdown of the page, or an error message starting with
+        "Error scraping". See utils/article_cleaner.py for extracting the article.
     """
-    try:
-        scrape_result = app.scrape_url(url, params={"formats": ["markdown"]})
-        return f"Result of scrape at {url}: {scrape_result}"
+    with span("firecrawl.scrape") as current:
+        try:
+            scrape_result = call_provider(
+                "firecrawl",
+                lambda: get_firecrawl_app().scrape_url(
+                    url, params={"formats": ["markdown"]}
+                ),
+            )
+            content = _markdown(scrape_result)
+            if not content:
+                raise ValueError("the result has no markdown content")
+            current.set(bytes=len(content))
+            return content
 
-    except Exception as e:
-        return f"Error scraping {url}: {e}"
+        except Exception as e:
+            current.set(error=repr(e))
+            return f"Error scraping {url}: {e}"
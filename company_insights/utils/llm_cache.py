@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.tracing import annotate
+
+# Responses are keyed on (model, prompt, parameters) and stored in SQLite.
+# Set LLM_CACHE_DISABLED=1 to always call the model.
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join("daily_data", ".llm_cache.sqlite")
+)
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true")
+
+
+def cache_key(model, prompt, params=None):
+    """Hashes the model, prompt (string or chat messages) and parameters."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite store of LLM responses with TTL and size-based LRU eviction."""
+
+    def __init__(
+        self,
+        path=LLM_CACHE_PATH,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_bytes=LLM_CACHE_MAX_BYTES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns the cached response for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return response
+
+    def set(self, key, model, response):
+        """Stores a response and evicts old entries if the cache is over budget."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until the cache fits again
+        excess = total - self.max_bytes
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        )
+        stale_keys = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide LLM cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_completion(model, prompt, generate, params=None):
+    """
+    Returns the cached response for (model, prompt, params), calling
+    `generate()` and storing its text result on a miss.
+    """
+    if LLM_CACHE_DISABLED:
+        return generate()
+
+    cache = get_cache()
+    key = cache_key(model, prompt, params)
+    response = cache.get(key)
+    annotate(cache_hit=response is not None)
+    if response is None:
+        response = generate()
+        cache.set(key, model, response)
+    return response
@@ -1,8 +1,16 @@
-import requests
 import datetime
 import os
 from dotenv import load_dotenv
 
+from utils.clients import get_news_session
+from utils.concurrency import (
+    RETRYABLE_STATUS_CODES,
+    ProviderError,
+    call_provider,
+    parse_retry_after,
+)
+from utils.tracing import ERROR, log, span
+
 load_dotenv()
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -22,10 +30,29 @@ def fetch_news(company, days=3, num_results=10):
 
     url = f"https://newsapi.org/v2/everything?q={search_query}&from={date_from}&sortBy=publishedAt&pageSize={num_results}&domains={business_domains}&apiKey={NEWS_API_KEY}"
 
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print(f"NewsAPI error: {response.text}")
-        return []
-
-    return response.json().get("articles", [])
+    def request():
+        response = get_news_session().get(url, timeout=30)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise ProviderError(
+                f"NewsAPI returned {response.status_code}: {response.text}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return response
+
+    with span("newsapi.fetch", company=company) as current:
+        try:
+            response = call_provider("newsapi", request)
+        except Exception as e:
+            current.set(error=repr(e))
+            log(f"NewsAPI error: {e}", ERROR)
+            return []
+        current.set(status=response.status_code, bytes=len(response.content))
+
+        if response.status_code != 200:
+            log(f"NewsAPI error: {response.text}", ERROR)
+            return []
+
+        articles = response.json().get("articles", [])
+        current.set(items=len(articles))
+    return articles
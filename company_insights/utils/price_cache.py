@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+from datetime import date
+
+import pandas as pd
+
+from utils.concurrency import ProviderError, call_provider
+from utils.tracing import ERROR, annotate, log, span
+
+# Daily OHLCV bars are stored per symbol as a pickled DataFrame alongside a JSON
+# file listing the [start, end) date ranges that have already been fetched.
+PRICE_CACHE_DIR = os.getenv(
+    "PRICE_CACHE_DIR", os.path.join("daily_data", ".price_cache")
+)
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _symbol_lock(symbol):
+    with _locks_lock:
+        return _locks.setdefault(symbol, threading.Lock())
+
+
+def _paths(symbol):
+    safe_symbol = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+    base = os.path.join(PRICE_CACHE_DIR, safe_symbol.upper())
+    return f"{base}.pkl", f"{base}.json"
+
+
+def _load(symbol):
+    """Loads the cached bars and covered ranges for a symbol, if any."""
+    data_path, ranges_path = _paths(symbol)
+    if not (os.path.exists(data_path) and os.path.exists(ranges_path)):
+        return pd.DataFrame(), []
+
+    with open(ranges_path, "r", encoding="utf-8") as f:
+        ranges = [tuple(r) for r in json.load(f)]
+    return pd.read_pickle(data_path), ranges
+
+
+def _save(symbol, df, ranges):
+    """Writes bars and covered ranges atomically so a crash never leaves them out of sync."""
+    os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+    data_path, ranges_path = _paths(symbol)
+
+    df.to_pickle(f"{data_path}.tmp")
+    with open(f"{ranges_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(ranges, f)
+
+    os.replace(f"{data_path}.tmp", data_path)
+    os.replace(f"{ranges_path}.tmp", ranges_path)
+
+
+def merge_ranges(ranges):
+    """Merges overlapping or touching [start, end) ISO-date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(ranges, start, end):
+    """Returns the parts of [start, end) not covered by the given merged ranges."""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in ranges:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _yahoo_error(history):
+    """
+    Turns the error messages yahooquery returns instead of a DataFrame into a
+    ProviderError, with a status code when they describe a rate limit or an
+    outage so that call_provider retries and throttles them.
+    """
+    message = str(history)
+    lowered = message.lower()
+    if any(s in lowered for s in ("too many requests", "rate limit", "429")):
+        return ProviderError(message, status_code=429)
+    if any(s in lowered for s in ("internal server error", "unavailable", "502")):
+        return ProviderError(message, status_code=503)
+    return ProviderError(message)
+
+
+def _fetch(symbol, start, end):
+    """Downloads daily bars for [start, end) from Yahoo Finance, or None on error."""
+    import yahooquery as yq
+
+    def download():
+        history = yq.Ticker(symbol).history(start=start, end=end)
+        # yahooquery returns a dict of error messages instead of raising
+        if not isinstance(history, pd.DataFrame):
+            raise _yahoo_error(history)
+        return history
+
+    with span("yahoo.history", symbol=symbol) as current:
+        try:
+            history = call_provider("yahoo", download)
+        except ProviderError as e:
+            current.set(error=str(e)[:200])
+            log(f"Yahoo Finance error for {symbol}: {e}", ERROR)
+            return None
+        current.set(rows=len(history))
+
+    if history.empty:
+        return history
+
+    history = history.reset_index()
+    history["date"] = pd.to_datetime(history["date"].map(lambda d: str(d)[:10]))
+    return history
+
+
+def get_history(symbol, start_date, end_date):
+    """
+    Returns daily bars for `symbol` in [start_date, end_date) as a DataFrame with
+    `symbol` and `date` columns, downloading only the date ranges that are not
+    already stored on disk.
+
+    Bars from today onwards are never marked as covered, since they are not final
+    yet and will be fetched again on the next call.
+    """
+    today = date.today().isoformat()
+
+    with _symbol_lock(symbol):
+        cached, ranges = _load(symbol)
+
+        new_frames = []
+        new_ranges = []
+        gaps = missing_ranges(ranges, start_date, end_date)
+        annotate(cache_hit=not gaps, gaps=len(gaps))
+        for gap_start, gap_end in gaps:
+            fetched = _fetch(symbol, gap_start, gap_end)
+            if fetched is None:
+                continue
+            if not fetched.empty:
+                new_frames.append(fetched)
+
+            final_end = min(gap_end, today)
+            if gap_start < final_end:
+                new_ranges.append((gap_start, final_end))
+
+        if new_frames:
+            cached = (
+                pd.concat([cached, *new_frames], ignore_index=True)
+                .drop_duplicates(subset=["symbol", "date"], keep="last")
+                .sort_values("date")
+                .reset_index(drop=True)
+            )
+        if new_ranges:
+            # Only persist final bars; anything from today onwards is refetched
+            final = (
+                cached[cached["date"] < pd.Timestamp(today)] if new_frames else cached
+            )
+            _save(symbol, final, merge_ranges(ranges + new_ranges))
+
+    if cached.empty:
+        return cached
+
+    mask = (cached["date"] >= pd.Timestamp(start_date)) & (
+        cached["date"] < pd.Timestamp(end_date)
+    )
+    window = cached.loc[mask].reset_index(drop=True)
+    window["date"] = window["date"].dt.date
+    return window
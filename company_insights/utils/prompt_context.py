@@ -0,0 +1,158 @@
+import os
+
+from utils.tokens import estimate_tokens, split_by_tokens
+
+# Competitor data is rendered for the synthesis prompt in a fixed, compact
+# schema instead of raw dict reprs, and trimmed to a token budget so prompt
+# size (and prefill time) does not grow with volatility or competitor count.
+SYNTHESIS_CONTEXT_TOKENS = int(os.getenv("SYNTHESIS_CONTEXT_TOKENS", "1200"))
+REASONING_CHARS = 300
+MAX_VOLUME_DAYS = 3
+
+
+def _pct(value):
+    return "n/a" if value is None else f"{value:+.2f}%"
+
+
+def _volume(value):
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= divisor:
+            return f"{value / divisor:.1f}{suffix}"
+    return str(int(value))
+
+
+def _insights(competitor_event):
+    """Returns the parse_stock_data insights of the competitor's ticker, or None."""
+    stock_data = competitor_event.get("stock_data")
+    if not isinstance(stock_data, dict) or "error" in stock_data or not stock_data:
+        return None
+    ticker = competitor_event.get("ticker")
+    return stock_data.get(ticker) or next(iter(stock_data.values()))
+
+
+def _car(study, window):
+    entry = study.get(window) if isinstance(study, dict) else None
+    if not entry or entry.get("car") is None:
+        return None
+    t_stat = entry.get("t_stat")
+    t_part = f" (t {t_stat:+.1f})" if t_stat is not None else ""
+    return f"CAR{window.replace(' ', '')} {_pct(entry['car'])}{t_part}"
+
+
+def _header(ce):
+    insights = _insights(ce)
+    parts = [
+        f"- {ce['competitor']} ({ce.get('ticker') or 'no ticker'})",
+        f"event {ce.get('event_date') or 'unknown'}",
+    ]
+    if insights:
+        parts.append(f"price {_pct(insights['overall_price_change'])} over window")
+    else:
+        error = (ce.get("stock_data") or {}).get("error", "no price data")
+        parts.append(f"price n/a ({error})")
+    car = _car(ce.get("abnormal_returns"), "[0, 5]")
+    if car:
+        parts.append(car)
+    return " | ".join(parts)
+
+
+def _reasoning(ce):
+    reasoning = " ".join((ce.get("reasoning") or "").split())
+    if not reasoning:
+        return None
+    if len(reasoning) > REASONING_CHARS:
+        reasoning = reasoning[: REASONING_CHARS - 3].rstrip() + "..."
+    return f"  why: {reasoning}"
+
+
+def _abnormal_returns(ce):
+    study = ce.get("abnormal_returns")
+    if not isinstance(study, dict) or "error" in study:
+        return None
+    cars = [_car(study, window) for window in study if window.startswith("[")]
+    cars = [car for car in cars if car]
+    if not cars:
+        return None
+    return f"  vs market (beta {study['beta']}): " + "; ".join(cars)
+
+
+def _extremes(ce):
+    insights = _insights(ce)
+    if not insights:
+        return None
+    gain, drop = insights["max_single_day_gain"], insights["max_single_day_drop"]
+    return (
+        f"  max gain {_pct(gain['percentage'])} ({gain['date'] or 'n/a'}); "
+        f"max drop {_pct(drop['percentage'])} ({drop['date'] or 'n/a'})"
+    )
+
+
+def _volume_days(ce):
+    insights = _insights(ce)
+    if not insights or not insights["high_volume_days"]:
+        return None
+    days = sorted(insights["high_volume_days"], key=lambda d: -d["volume"])
+    shown = ", ".join(
+        f"{day['date']} {_volume(day['volume'])}" for day in days[:MAX_VOLUME_DAYS]
+    )
+    more = len(days) - MAX_VOLUME_DAYS
+    return f"  volume spikes: {shown}" + (f" (+{more} more)" if more > 0 else "")
+
+
+def _moving_average(ce):
+    insights = _insights(ce)
+    averages = insights["7_day_moving_avg"] if insights else None
+    if not averages:
+        return None
+    return f"  7d avg close: {averages[0]:.2f} -> {averages[-1]:.2f}"
+
+
+# Lines per competitor, most informative first. Over budget, the least
+# informative remaining line of the most detailed competitor is dropped first.
+SECTIONS = (
+    _header,
+    _reasoning,
+    _abnormal_returns,
+    _extremes,
+    _volume_days,
+    _moving_average,
+)
+
+
+def _render(lines, levels):
+    return "\n".join(
+        line
+        for competitor_lines, level in zip(lines, levels)
+        for line in competitor_lines[:level]
+        if line
+    )
+
+
+def build_competitor_context(competitor_events, max_tokens=SYNTHESIS_CONTEXT_TOKENS):
+    """
+    Renders competitor events, their price insights and abnormal returns in a
+    compact fixed schema within max_tokens.
+
+    Returns:
+        (str, int): The rendered context and its estimated token count.
+    """
+    lines = [[section(ce) for section in SECTIONS] for ce in competitor_events]
+    # Number of leading lines shown per competitor, ignoring trailing empty ones
+    levels = [
+        max((i + 1 for i, line in enumerate(competitor_lines) if line), default=0)
+        for competitor_lines in lines
+    ]
+
+    text = _render(lines, levels)
+    while estimate_tokens(text) > max_tokens and max(levels, default=1) > 1:
+        # Trim the last of the most detailed competitors, keeping earlier
+        # (higher-ranked) competitors detailed the longest
+        most = max(levels)
+        index = len(levels) - 1 - levels[::-1].index(most)
+        levels[index] -= 1
+        text = _render(lines, levels)
+
+    if estimate_tokens(text) > max_tokens:
+        # Even the headers alone do not fit
+        text = split_by_tokens(text, max_tokens)[0]
+    return text, estimate_tokens(text)
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Every scraped article is recorded by normalized URL, exact content hash and a
+# 64-bit simhash, so later runs can skip URLs and syndicated copies they have
+# already stored for a company, and reuse pages scraped for other companies.
+SCRAPE_INDEX_PATH = os.getenv(
+    "SCRAPE_INDEX_PATH", os.path.join("daily_data", ".scrape_index.sqlite")
+)
+
+# Articles whose simhashes differ in at most this many bits are near-duplicates.
+# The 64-bit hash is split into 4 bands of 16 bits, so any pair within 3 bits
+# shares at least one identical band.
+NEAR_DUPLICATE_BITS = 3
+_BANDS = 4
+_BAND_BITS = 16
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|cmpid|ref|src)$")
+_WORD = re.compile(r"\w+")
+
+
+def normalize_url(url):
+    """Normalizes a URL so trivially different links to one article compare equal."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query)
+            if not _TRACKING_PARAMS.match(key.lower())
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def content_hash(text):
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def simhash(text, shingle_size=3):
+    """Computes a 64-bit simhash over word shingles of the text."""
+    words = _WORD.findall(text.lower())
+    shingles = [
+        " ".join(words[i : i + shingle_size])
+        for i in range(max(1, len(words) - shingle_size + 1))
+    ]
+
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _bands(fingerprint):
+    mask = (1 << _BAND_BITS) - 1
+    return [(fingerprint >> (band * _BAND_BITS)) & mask for band in range(_BANDS)]
+
+
+class ScrapeIndex:
+    """
+    SQLite index of scraped articles keyed by normalized URL and content.
+
+    Article content is shared, so a page scraped for one company is not
+    scraped again for another. Whether an article is new or a copy of one
+    already stored is decided per company, since each company's summary only
+    sees the articles stored for it.
+    """
+
+    def __init__(self, path=SCRAPE_INDEX_PATH):
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                simhash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                scraped_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_content_hash
+                ON articles (content_hash);
+            CREATE TABLE IF NOT EXISTS simhash_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                url_key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS simhash_bands_lookup
+                ON simhash_bands (band, value);
+            CREATE TABLE IF NOT EXISTS company_articles (
+                company TEXT NOT NULL,
+                url_key TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                duplicate_of TEXT,
+                PRIMARY KEY (company, url_key)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, url):
+        """Returns the scraped article for a URL as a dict, or None if never scraped."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content, first_seen FROM articles WHERE url_key = ?",
+                (normalize_url(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("url", "content", "first_seen"), row))
+
+    def company_record(self, company, url):
+        """
+        Returns when a company first stored a URL and the article it
+        duplicates, as a dict, or None if the company never stored it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT first_seen, duplicate_of FROM company_articles
+                WHERE company = ? AND url_key = ?
+                """,
+                (company, normalize_url(url)),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("first_seen", "duplicate_of"), row))
+
+    def _find_duplicate(self, company, url_key, digest, fingerprint):
+        row = self._conn.execute(
+            """
+            SELECT a.url FROM articles a
+            JOIN company_articles c ON c.url_key = a.url_key
+            WHERE c.company = ? AND c.duplicate_of IS NULL
+                AND a.content_hash = ? AND a.url_key != ?
+            """,
+            (company, digest, url_key),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        for band, value in enumerate(_bands(fingerprint)):
+            candidates = self._conn.execute(
+                """
+                SELECT a.url, a.simhash FROM simhash_bands b
+                JOIN company_articles c ON c.url_key = b.url_key
+                JOIN articles a ON a.url_key = b.url_key
+                WHERE b.band = ? AND b.value = ? AND b.url_key != ?
+                    AND c.company = ? AND c.duplicate_of IS NULL
+                """,
+                (band, value, url_key, company),
+            )
+            for url, other in candidates:
+                if bin(fingerprint ^ int(other, 16)).count("1") <= NEAR_DUPLICATE_BITS:
+                    return url
+        return None
+
+    def add(self, url, content, day, company):
+        """
+        Records an article stored for a company. If its content matches or
+        nearly matches an article already stored for that company under
+        another URL, it is recorded as a duplicate and the original URL is
+        returned; otherwise returns None.
+        """
+        url_key = normalize_url(url)
+        digest = content_hash(content)
+        fingerprint = simhash(content)
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO articles
+                    (url_key, url, content_hash, simhash, content, first_seen, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url_key) DO UPDATE SET
+                    url = excluded.url,
+                    content_hash = excluded.content_hash,
+                    simhash = excluded.simhash,
+                    content = excluded.content,
+                    scraped_at = excluded.scraped_at
+                """,
+                (
+                    url_key,
+                    url,
+                    digest,
+                    f"{fingerprint:016x}",
+                    content,
+                    day,
+                    time.time(),
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM simhash_bands WHERE url_key = ?", (url_key,)
+            )
+            self._conn.executemany(
+                "INSERT INTO simhash_bands VALUES (?, ?, ?)",
+                [
+                    (band, value, url_key)
+                    for band, value in enumerate(_bands(fingerprint))
+                ],
+            )
+
+            duplicate_of = self._find_duplicate(company, url_key, digest, fingerprint)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO company_articles VALUES (?, ?, ?, ?)",
+                (company, url_key, day, duplicate_of),
+            )
+            self._conn.commit()
+        return duplicate_of
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_scrape_index():
+    """Returns the process-wide scrape index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ScrapeIndex()
+        return _index
@@ -0,0 +1,109 @@
+import datetime
+import os
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, conlist, create_model
+
+from utils.clients import LLM_MODEL, get_keep_alive, get_ollama_client
+from utils.concurrency import call_provider
+from utils.llm_cache import cached_completion
+from utils.tokens import estimate_tokens
+from utils.tracing import span
+
+# Ollama constrains generation to the JSON schema passed as `format`, and the
+# result is validated with pydantic. If validation still fails, the model is
+# shown its output and the errors and asked for a fix, at most
+# STRUCTURED_MAX_REPAIRS times.
+STRUCTURED_MAX_REPAIRS = int(os.getenv("STRUCTURED_MAX_REPAIRS", "2"))
+
+
+class StructuredOutputError(ValueError):
+    """The model did not produce valid output for the schema within the repairs."""
+
+
+class CompetitorEvent(BaseModel):
+    competitor: str = Field(description="Company name")
+    reasoning: str = Field(
+        description="The similar event, its date (year, month, day) and what "
+        "happened to the company's stock as a result"
+    )
+
+
+class CompetitorEvents(BaseModel):
+    competitors: List[CompetitorEvent]
+
+
+class EventDate(BaseModel):
+    date: Optional[datetime.date] = Field(
+        description="Most likely date of the event as YYYY-MM-DD, or null if unknown"
+    )
+
+
+def event_dates_model(count):
+    """A schema for exactly `count` event dates, in query order."""
+    return create_model(
+        "EventDates",
+        dates=(
+            conlist(Optional[datetime.date], min_length=count, max_length=count),
+            ...,
+        ),
+    )
+
+
+def _repair_prompt(error):
+    problems = "; ".join(
+        f"{'.'.join(map(str, e['loc'])) or 'output'}: {e['msg']}"
+        for e in error.errors()[:5]
+    )
+    return (
+        f"Your previous answer was not valid: {problems}. "
+        "Reply again with only the corrected JSON matching the schema."
+    )
+
+
+def structured_completion(prompt, schema, model=LLM_MODEL):
+    """
+    Asks Ollama for JSON conforming to the pydantic model `schema` and returns
+    the validated instance. Responses, including repairs, are cached.
+
+    Raises StructuredOutputError if no valid output was produced.
+    """
+    json_schema = schema.model_json_schema()
+    messages = [{"role": "user", "content": prompt}]
+    params = {"format": json_schema, "temperature": 0}
+
+    with span(
+        "llm.structured", schema=schema.__name__, prompt_tokens=estimate_tokens(prompt)
+    ) as current:
+        for attempt in range(STRUCTURED_MAX_REPAIRS + 1):
+            request = list(messages)
+            response = cached_completion(
+                model,
+                request,
+                lambda: call_provider(
+                    "ollama",
+                    lambda: get_ollama_client().chat(
+                        model=model,
+                        messages=request,
+                        format=json_schema,
+                        options={"temperature": 0},
+                        keep_alive=get_keep_alive(),
+                    ),
+                )["message"]["content"],
+                params=params,
+            )
+            current.set(repairs=attempt, response_tokens=estimate_tokens(response))
+            try:
+                return schema.model_validate_json(response)
+            except ValidationError as e:
+                error = e
+            messages = [
+                messages[0],
+                {"role": "assistant", "content": response},
+                {"role": "user", "content": _repair_prompt(error)},
+            ]
+        current.set(error=str(error)[:200])
+
+    raise StructuredOutputError(
+        f"No valid {schema.__name__} after {STRUCTURED_MAX_REPAIRS} repairs: {error}"
+    )
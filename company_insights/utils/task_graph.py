@@ -0,0 +1,110 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def when_all(futures, callback):
+    """Calls callback() once every future has finished (immediately if none)."""
+    futures = list(futures)
+    if not futures:
+        callback()
+        return
+
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            ready = remaining[0] == 0
+        if ready:
+            callback()
+
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def chain_future(source, target):
+    """Completes target with the result or exception of source once it finishes."""
+
+    def copy(_):
+        if source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    source.add_done_callback(copy)
+
+
+class TaskGraph:
+    """
+    Runs a dependency graph of tasks on one bounded thread pool per stage.
+
+    A task is identified by (stage, key). Submitting a task whose key was
+    already submitted returns the existing future, so identical work requested
+    by different callers runs once. Tasks start as soon as the futures they
+    depend on finish, so independent stages overlap.
+    """
+
+    def __init__(self, stage_workers):
+        self._pools = {
+            stage: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=stage)
+            for stage, workers in stage_workers.items()
+        }
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def submit(self, stage, key, fn, after=()):
+        """
+        Schedules fn() on the stage's pool once all `after` futures finished and
+        returns a future for its result. fn may call .result() on those futures.
+        """
+        with self._lock:
+            if (stage, key) in self._tasks:
+                self.stats[(stage, "merged")] += 1
+                return self._tasks[(stage, key)]
+            future = Future()
+            self._tasks[(stage, key)] = future
+            self.stats[(stage, "run")] += 1
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+        when_all(after, lambda: self._pools[stage].submit(run))
+        return future
+
+    def submit_after(self, stage, after, make_task):
+        """
+        Like submit, but the task's key and function are built by
+        make_task() -> (key, fn) only once `after` finished, so they can depend
+        on upstream results. Returns a future for the task's result.
+        """
+        proxy = Future()
+
+        def schedule():
+            try:
+                key, fn = make_task()
+            except BaseException as e:
+                proxy.set_exception(e)
+                return
+            chain_future(self.submit(stage, key, fn), proxy)
+
+        when_all(after, schedule)
+        return proxy
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+
+    def summary(self):
+        """Returns {stage: {"run": n, "merged": m}} for the tasks submitted so far."""
+        summary = {stage: {"run": 0, "merged": 0} for stage in self._pools}
+        for (stage, kind), count in self.stats.items():
+            summary[stage][kind] = count
+        return summary
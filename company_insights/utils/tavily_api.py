@@ -1,18 +1,22 @@
-import os
-from tavily import TavilyClient
-from dotenv import load_dotenv
-
-load_dotenv()
-
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
+from utils.clients import get_tavily_client
+from utils.concurrency import call_provider
+from utils.tracing import ERROR, log, span
 
 
 def fetch_tavily_results(query):
     """Fetches Tavily search results for a given company."""
-    try:
-        results = tavily_client.search(query=query)
-        return results.get("results", [])
-    except Exception as e:
-        print(f"Error querying Tavily: {e}")
-        return []
+    with span("tavily.search") as current:
+        try:
+            results = call_provider(
+                "tavily", lambda: get_tavily_client().search(query=query)
+            )
+            results = results.get("results", [])
+        except Exception as e:
+            current.set(error=repr(e))
+            log(f"Error querying Tavily: {e}", ERROR)
+            return []
+        current.set(
+            items=len(results),
+            bytes=sum(len(result.get("content") or "") for result in results),
+        )
+    return results
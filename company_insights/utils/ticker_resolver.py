@@ -0,0 +1,137 @@
+import difflib
+import json
+import os
+import re
+import threading
+import time
+
+from utils.concurrency import call_provider
+from utils.tracing import ERROR, log
+
+# Company names returned by the LLM are mapped to ticker symbols through a
+# local symbol table. Exact and fuzzy matches are answered from the table; only
+# misses are looked up on Yahoo Finance and the answer is stored for next time.
+# A "no ticker" answer may come from a transient empty search, so it is only
+# trusted for TICKER_MISS_TTL_SECONDS and never fuzzy-matched to other names.
+SYMBOL_TABLE_PATH = os.getenv(
+    "SYMBOL_TABLE_PATH", os.path.join("daily_data", ".symbols.json")
+)
+FUZZY_MATCH_CUTOFF = 0.88
+TICKER_MISS_TTL_SECONDS = int(os.getenv("TICKER_MISS_TTL_SECONDS", str(24 * 3600)))
+
+_SUFFIXES = re.compile(
+    r"\b(the|inc|incorporated|corp|corporation|co|company|ltd|limited|plc|"
+    r"holdings|holding|group|sa|ag|nv|se|llc|lp)\b"
+)
+_NON_ALNUM = re.compile(r"[^a-z0-9& ]+")
+
+
+def normalize_name(name):
+    """Lowercases a company name and drops punctuation and legal suffixes."""
+    name = _NON_ALNUM.sub(" ", name.lower())
+    name = _SUFFIXES.sub(" ", name)
+    return " ".join(name.split())
+
+
+def lookup_symbol(name):
+    """Searches Yahoo Finance for the equity ticker of a company name."""
+    import yahooquery as yq
+
+    results = call_provider(
+        "yahoo", lambda: yq.search(name, quotes_count=5, news_count=0)
+    )
+    for quote in results.get("quotes", []) if isinstance(results, dict) else []:
+        if quote.get("quoteType") == "EQUITY" and quote.get("symbol"):
+            return quote["symbol"], quote.get("longname") or quote.get("shortname")
+    return None, None
+
+
+class TickerResolver:
+    """Resolves company names to tickers using a cached, fuzzy-matched table."""
+
+    def __init__(self, path=SYMBOL_TABLE_PATH, lookup=lookup_symbol):
+        self.path = path
+        self.lookup = lookup
+        self._lock = threading.Lock()
+        self.table = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.table = json.load(f)
+
+    def _match(self, key):
+        entry = self.table.get(key)
+        if entry is not None and (
+            entry["symbol"]
+            or time.time() - entry.get("checked_at", 0) < TICKER_MISS_TTL_SECONDS
+        ):
+            return entry
+        known = [name for name, entry in self.table.items() if entry["symbol"]]
+        close = difflib.get_close_matches(key, known, n=1, cutoff=FUZZY_MATCH_CUTOFF)
+        return self.table[close[0]] if close else None
+
+    def add(self, name, symbol, official_name=None):
+        """Stores a name-to-ticker mapping, e.g. to seed the table by hand."""
+        with self._lock:
+            entry = {"symbol": symbol, "name": official_name or name}
+            self.table[normalize_name(name)] = entry
+            if official_name:
+                self.table.setdefault(normalize_name(official_name), entry)
+            self._save()
+
+    def _add_miss(self, name):
+        with self._lock:
+            self.table[normalize_name(name)] = {
+                "symbol": None,
+                "name": name,
+                "checked_at": time.time(),
+            }
+            self._save()
+
+    def resolve(self, name):
+        """Returns the ticker for a company name, or None if none could be found."""
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        with self._lock:
+            entry = self._match(key)
+        if entry is not None:
+            return entry["symbol"]
+
+        try:
+            symbol, official_name = self.lookup(name)
+        except Exception as e:
+            # Do not remember failed lookups; they may succeed next time
+            log(f"Error looking up ticker for {name}: {e}", ERROR)
+            return None
+
+        if symbol:
+            self.add(name, symbol, official_name)
+        else:
+            self._add_miss(name)
+        return symbol
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.table, f, indent=2, sort_keys=True)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_ticker_resolver():
+    """Returns the shared ticker resolver, loading the symbol table on first use."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = TickerResolver()
+        return _resolver
+
+
+def resolve_ticker(name):
+    return get_ticker_resolver().resolve(name)
@@ -0,0 +1,63 @@
+# Llama-family tokenizers average roughly four characters per token on English
+# news text. The estimate is only used for budgeting, so a cheap approximation
+# is preferred over loading the model tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimates how many tokens the model will see for the given text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_by_tokens(text, max_tokens):
+    """Splits text into pieces of at most max_tokens, preferring paragraph breaks."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        # Hard-wrap paragraphs that are too long on their own
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = candidate
+
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_by_tokens(texts, max_tokens, separator="\n\n"):
+    """
+    Greedily packs texts into chunks of at most max_tokens each. Texts longer
+    than the budget are split first.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    separator_tokens = estimate_tokens(separator)
+
+    for text in texts:
+        for piece in split_by_tokens(text, max_tokens):
+            piece_tokens = estimate_tokens(piece)
+            if (
+                current
+                and current_tokens + separator_tokens + piece_tokens > max_tokens
+            ):
+                chunks.append(separator.join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens + (separator_tokens if current_tokens else 0)
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
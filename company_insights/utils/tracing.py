@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# Every pipeline stage runs inside a span that records its wall time and
+# attributes such as bytes fetched, token counts and cache hits. Spans are
+# appended to a JSON-lines trace file per run, and a per-run summary is written
+# when the process exits.
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join("daily_data", ".traces"))
+TRACING_DISABLED = os.getenv("TRACING_DISABLED", "").lower() in ("1", "true")
+
+# Console verbosity: 0 prints only errors, 1 progress messages, 2 also full
+# prompts, responses and intermediate data.
+ERROR, INFO, DEBUG = 0, 1, 2
+VERBOSITY = int(os.getenv("COMPANY_INSIGHTS_VERBOSITY", str(INFO)))
+
+RUN_ID = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+_local = threading.local()
+_lock = threading.Lock()
+_trace_file = None
+_stage_stats = defaultdict(lambda: {"durations": [], "totals": defaultdict(float)})
+
+# Numeric span attributes that are summed per stage in the run summary
+_SUMMED_ATTRIBUTES = (
+    "bytes",
+    "cleaned_bytes",
+    "prompt_tokens",
+    "response_tokens",
+    "rows",
+    "items",
+)
+
+
+def log(message, level=INFO):
+    """Prints a message if the configured verbosity includes its level."""
+    if VERBOSITY >= level:
+        print(message)
+
+
+def _write(record):
+    global _trace_file
+    if TRACING_DISABLED:
+        return
+    with _lock:
+        if _trace_file is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            _trace_file = open(
+                os.path.join(TRACE_DIR, f"{RUN_ID}.jsonl"), "a", encoding="utf-8"
+            )
+        _trace_file.write(json.dumps(record, default=str) + "\n")
+        _trace_file.flush()
+
+
+class Span:
+    def __init__(self, stage, attributes):
+        self.stage = stage
+        self.attributes = dict(attributes)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+def current_span():
+    """Returns the innermost open span of this thread, or None."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def annotate(**attributes):
+    """Adds attributes to the innermost open span of this thread, if any."""
+    span = current_span()
+    if span is not None:
+        span.set(**attributes)
+
+
+@contextmanager
+def span(stage, **attributes):
+    """
+    Times a pipeline stage. Attributes passed here or added later with
+    span.set()/annotate() are written with the span to the trace file.
+    """
+    current = Span(stage, attributes)
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    parent = stack[-1].stage if stack else None
+    stack.append(current)
+
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=repr(e))
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+
+        _record(stage, duration, current.attributes)
+        _write(
+            {
+                "run_id": RUN_ID,
+                "stage": stage,
+                "parent": parent,
+                "thread": threading.current_thread().name,
+                "started_at": started_at,
+                "duration_s": round(duration, 6),
+                **current.attributes,
+            }
+        )
+
+
+def _record(stage, duration, attributes):
+    with _lock:
+        stats = _stage_stats[stage]
+        stats["durations"].append(duration)
+        totals = stats["totals"]
+        for name in _SUMMED_ATTRIBUTES:
+            value = attributes.get(name)
+            if isinstance(value, (int, float)):
+                totals[name] += value
+        if "cache_hit" in attributes:
+            totals["cache_lookups"] += 1
+            totals["cache_hits"] += bool(attributes["cache_hit"])
+        if "error" in attributes:
+            totals["errors"] += 1
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_summary():
+    """Returns per-stage counts, wall-time percentiles, totals and cache hit rates."""
+    summary = {}
+    with _lock:
+        for stage, stats in sorted(_stage_stats.items()):
+            durations = sorted(stats["durations"])
+            totals = dict(stats["totals"])
+            entry = {
+                "count": len(durations),
+                "total_s": round(sum(durations), 4),
+                "p50_s": round(_percentile(durations, 0.5), 4),
+                "p95_s": round(_percentile(durations, 0.95), 4),
+                "max_s": round(durations[-1], 4),
+            }
+            lookups = totals.pop("cache_lookups", 0)
+            hits = totals.pop("cache_hits", 0)
+            if lookups:
+                entry["cache_hit_rate"] = round(hits / lookups, 3)
+            entry.update({name: int(value) for name, value in totals.items()})
+            summary[stage] = entry
+    return summary
+
+
+def reset():
+    """Clears the collected stage statistics."""
+    with _lock:
+        _stage_stats.clear()
+
+
+def write_run_summary():
+    """Writes the run summary next to the trace file and logs it."""
+    summary = run_summary()
+    if not summary:
+        return summary
+
+    if not TRACING_DISABLED:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{RUN_ID}.summary.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"run_id": RUN_ID, "stages": summary}, f, indent=2)
+
+    log("\n--- Run Summary ---")
+    for stage, entry in summary.items():
+        details = ", ".join(
+            f"{name}={value}"
+            for name, value in entry.items()
+            if name not in ("count", "total_s")
+        )
+        log(f"{stage}: {entry['count']} calls, {entry['total_s']}s total, {details}")
+    return summary
+
+
+atexit.register(write_run_summary)
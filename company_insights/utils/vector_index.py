@@ -0,0 +1,249 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from utils.clients import get_keep_alive, get_ollama_client
+from utils.concurrency import call_provider
+from utils.tracing import log
+
+# Historical events (summary one-liners and competitor events found by past
+# analyses) are embedded with an Ollama embedding model and kept as a
+# normalized float32 matrix, so nearest neighbours are one matrix product.
+# On disk the rows are appended to a raw float32 file and the items to a JSON
+# lines file, so adding events never rewrites the existing index.
+EVENT_INDEX_DIR = os.getenv(
+    "EVENT_INDEX_DIR", os.path.join("daily_data", ".event_index")
+)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+EMBEDDING_BATCH_SIZE = 64
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL):
+    """Embeds texts with Ollama and returns an (n, dim) float32 matrix."""
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = texts[start : start + EMBEDDING_BATCH_SIZE]
+        response = call_provider(
+            "ollama",
+            lambda: get_ollama_client().embed(
+                model=model, input=batch, keep_alive=get_keep_alive()
+            ),
+        )
+        vectors.extend(response["embeddings"])
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def item_id(text, metadata):
+    payload = json.dumps({"text": text, "metadata": metadata}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _truncate(path, size):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+class VectorIndex:
+    """Persistent cosine-similarity index over texts with metadata."""
+
+    def __init__(self, directory=EVENT_INDEX_DIR, embed=embed_texts):
+        self.directory = directory
+        self.embed = embed
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.items_path = os.path.join(directory, "items.jsonl")
+        self.meta_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+
+        self.items = []
+        self.vectors = None
+        legacy_path = os.path.join(directory, "vectors.npy")
+        if os.path.exists(legacy_path) and not os.path.exists(self.meta_path):
+            self._convert_legacy(legacy_path)
+        if os.path.exists(self.meta_path):
+            self._load()
+        else:
+            # Items saved without any vectors cannot be searched
+            _truncate(self.items_path, 0)
+        self._ids = {item["id"] for item in self.items}
+
+    def _convert_legacy(self, legacy_path):
+        """Moves an index saved as vectors.npy to the appendable layout."""
+        vectors = np.load(legacy_path)
+        if len(vectors):
+            self._write_meta(vectors.shape[1])
+            np.ascontiguousarray(vectors, dtype=np.float32).tofile(self.vectors_path)
+        os.remove(legacy_path)
+
+    def _write_meta(self, dim):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self.meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"dim": dim}, f)
+        os.replace(f"{self.meta_path}.tmp", self.meta_path)
+
+    def _load(self):
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            dim = json.load(f)["dim"]
+        vectors = np.zeros(0, dtype=np.float32)
+        if os.path.exists(self.vectors_path):
+            vectors = np.fromfile(self.vectors_path, dtype=np.float32)
+        vectors = vectors[: len(vectors) // dim * dim].reshape(-1, dim)
+
+        # Byte offset of the end of each complete item line
+        ends = [0]
+        if os.path.exists(self.items_path):
+            with open(self.items_path, "rb") as f:
+                for line in f:
+                    # A line without its newline was cut off by a crash
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        self.items.append(json.loads(line))
+                    except ValueError:
+                        break
+                    ends.append(ends[-1] + len(line))
+
+        # Keep items and vectors aligned if a crash interrupted an append
+        size = min(len(self.items), len(vectors))
+        self.items = self.items[:size]
+        self.vectors = vectors[:size] if size else None
+        _truncate(self.vectors_path, size * dim * vectors.itemsize)
+        _truncate(self.items_path, ends[size])
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, entries):
+        """
+        Adds (text, metadata) pairs that are not indexed yet and appends them
+        to the index files. Returns the number of new items.
+        """
+        new_items = {}
+        for text, metadata in entries:
+            entry_id = item_id(text, metadata)
+            if entry_id not in self._ids and text.strip():
+                new_items[entry_id] = {
+                    "id": entry_id,
+                    "text": text,
+                    "metadata": metadata,
+                }
+        if not new_items:
+            return 0
+
+        new_items = list(new_items.values())
+        new_vectors = _normalize(self.embed([item["text"] for item in new_items]))
+        with self._lock:
+            # Another thread may have added some of the same items meanwhile
+            keep = [
+                i for i, item in enumerate(new_items) if item["id"] not in self._ids
+            ]
+            new_items = [new_items[i] for i in keep]
+            new_vectors = new_vectors[keep]
+            self._ids.update(item["id"] for item in new_items)
+            if self.vectors is None:
+                self.vectors = new_vectors
+            else:
+                self.vectors = np.vstack([self.vectors, new_vectors])
+            self.items.extend(new_items)
+            self._append(new_items, new_vectors)
+        return len(new_items)
+
+    def _append(self, items, vectors):
+        if not os.path.exists(self.meta_path):
+            self._write_meta(vectors.shape[1])
+        # Vectors first: items without a vector are dropped on the next load
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.items_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(item) + "\n" for item in items))
+
+    def search(self, query, k=5, min_score=0.0):
+        """Returns up to k (score, item) pairs most similar to the query text."""
+        if not self.items:
+            return []
+
+        query_vector = _normalize(self.embed([query]))[0]
+        with self._lock:
+            scores = self.vectors @ query_vector
+            items = self.items
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), items[i]) for i in top if scores[i] >= min_score]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_event_index():
+    """Returns the shared event index, loading it from disk on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex()
+        return _index
+
+
+def summary_events(summary_text):
+    """Extracts the bullet or numbered one-liners from a generated summary."""
+    events = []
+    for line in summary_text.splitlines():
+        if _BULLET.match(line):
+            event = _BULLET.sub("", line).strip().strip("*").strip()
+            # Skip section headings such as "1. Essential one-liners:"
+            if len(event) >= 40:
+                events.append(event)
+    return events
+
+
+def update_event_index(base_dir="daily_data"):
+    """Indexes the one-liners of every daily summary not yet in the index."""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(base_dir, "*", "*", "*_summary.txt"))):
+        company_dir, filename = os.path.split(path)
+        day_dir, company = os.path.split(company_dir)
+        if filename != f"{company}_summary.txt":
+            continue
+
+        with open(path, "r", encoding="utf-8") as f:
+            summary_text = f.read()
+        metadata = {
+            "source": "summary",
+            "company": company,
+            "date": os.path.basename(day_dir),
+        }
+        entries.extend((event, metadata) for event in summary_events(summary_text))
+
+    added = get_event_index().add(entries)
+    log(f"Added {added} events to the event index")
+    return added
+
+
+def record_competitor_events(competitor_events):
+    """Indexes competitor events found by an analysis so later runs can reuse them."""
+    entries = [
+        (
+            f"{event['competitor']}: {event['reasoning']}",
+            {
+                "source": "analysis",
+                "company": event["competitor"],
+                "date": event.get("event_date"),
+            },
+        )
+        for event in competitor_events
+        if event.get("competitor") and event.get("reasoning")
+    ]
+    return get_event_index().add(entries)